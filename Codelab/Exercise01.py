@@ -13,38 +13,248 @@ Other Features:
  - "Next Question" button
  - Restart button
  - User profiles (enter your name)
- - Local leaderboard
+ - Local leaderboard (cached in memory, saved by a background thread
+   to a compact binary file, see leaderboard_format.py)
  - One-shot hint
 """
 
 import tkinter as tk
 from tkinter import ttk, messagebox
 import random
-import json
 import os
+import atexit
+import sys
+import threading
+import traceback
 from datetime import datetime
 
+from tk_watchdog import install_from_env as install_stall_monitor
+from mem_profile import install_from_env as install_memory_profiler
+from codelab_data import CachedFile, data_path
+from leaderboard_format import (InvalidEntryError, LeaderboardFile, LeaderboardFormatError,
+                                append_entries, check_entry, migrate_json)
+
 # -----------------------------
 # Config & Data Storage Helpers
 # -----------------------------
-LEADERBOARD_FILE = "leaderboard.json"
+LEADERBOARD_FILE = data_path("leaderboard.bin")
 TOTAL_QUESTIONS = 10
-
-def load_leaderboard():
-    if os.path.exists(LEADERBOARD_FILE):
+LEADERBOARD_SIZE = 50       # entries kept in memory for the leaderboard screen
+SAVE_COALESCE_DELAY = 0.25  # seconds to wait for more saves before writing
+POLL_INTERVAL = 1.0         # seconds between checks for outside changes to the file
+MAX_RETRY_DELAY = 30.0      # longest wait between attempts after a failed save
+
+
+def grade_for_score(score):
+    pct = (score / (TOTAL_QUESTIONS * 10)) * 100
+    if pct >= 90:
+        return "A+"
+    elif pct >= 80:
+        return "A"
+    elif pct >= 70:
+        return "B"
+    elif pct >= 60:
+        return "C"
+    else:
+        return "D"
+
+
+def migrate_legacy_leaderboard(path=LEADERBOARD_FILE):
+    """Convert an old JSON leaderboard next to `path` the first time round."""
+    legacy_path = os.path.splitext(path)[0] + ".json"
+    if not os.path.exists(path) and os.path.exists(legacy_path):
         try:
-            with open(LEADERBOARD_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+            migrate_json(legacy_path, path, grade_for_score)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # unreadable old file: start a fresh leaderboard
+
+
+def read_top_entries(path, limit=LEADERBOARD_SIZE):
+    with LeaderboardFile(path) as lbf:
+        return lbf.top(limit)
+
+
+class LeaderboardStore:
+    """In-memory leaderboard cache backed by a background writer thread.
+
+    Reads are served from the cache, so the Tk thread never touches the disk.
+    Saves update the cache and wake the writer, which waits a short moment so
+    that a burst of saves ends up as a single atomic write. While idle, the
+    writer also reloads the cache if the file is changed from outside.
+
+    A failed save is retried with a growing delay; `error` then describes the
+    problem (None once everything is saved) so the window can show it.
+    """
+
+    def __init__(self, path=LEADERBOARD_FILE, delay=SAVE_COALESCE_DELAY):
+        self.path = path
+        self.delay = delay
+        self._file = CachedFile(path, read_top_entries, errors=(OSError, LeaderboardFormatError))
+        self._cond = threading.Condition()
+        self._entries = None        # None until the first load has finished
+        self._pending = []          # new entries not yet on disk
+        self._clear_pending = False
+        self._writing = False
+        self._closed = False
+        self._retry_delay = 0.0
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="leaderboard-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def _dirty(self):
+        return bool(self._pending) or self._clear_pending
+
+    # --- Tk-thread API (never does file IO) ---
+    def entries(self):
+        """Return a copy of the cached leaderboard, best score first."""
+        with self._cond:
+            while self._entries is None:
+                self._cond.wait()
+            return list(self._entries)
+
+    def add(self, name, score):
+        entry = {"name": name, "score": score, "grade": grade_for_score(score),
+                 "date": datetime.now().isoformat()}
+        with self._cond:
+            while self._entries is None:
+                self._cond.wait()
+            lb = self._entries + [entry]
+            self._entries = sorted(lb, key=lambda x: x["score"], reverse=True)[:LEADERBOARD_SIZE]
+            self._pending.append(entry)
+            self._cond.notify_all()
+
+    def clear(self):
+        with self._cond:
+            self._entries = []
+            self._pending = []
+            self._clear_pending = True
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Block until every pending change is on disk. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._dirty and not self._writing, timeout)
+
+    def close(self, timeout=5):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        if self._pending:
+            self._report(f"{len(self._pending)} score(s) could not be saved and were lost")
+
+    def _report(self, message):
+        self.error = message
+        print(f"Leaderboard: {message}", file=sys.stderr)
+
+    # --- writer thread ---
+    def _run(self):
+        entries = []
+        try:
+            migrate_legacy_leaderboard(self.path)
+            entries = self._file.get()
         except Exception:
-            return []
-    return []
+            # Unreadable file: start empty rather than leave the Tk thread waiting
+            self._report(f"could not read {self.path}:\n{traceback.format_exc()}")
+        finally:
+            with self._cond:
+                if self._entries is None:
+                    self._entries = entries
+                self._cond.notify_all()
+
+        while True:
+            with self._cond:
+                woke = self._cond.wait_for(lambda: self._dirty or self._closed, POLL_INTERVAL)
+                if self._closed and not self._dirty:
+                    return
+            if not woke:
+                try:
+                    if self._file.is_stale():
+                        # Changed by someone else (another quiz window, a restore...)
+                        entries = self._file.get()
+                        with self._cond:
+                            if not self._dirty:
+                                self._entries = entries
+                except OSError:
+                    pass  # keep serving the cache; try again on the next poll
+                continue
+            with self._cond:
+                if not self._closed:
+                    # Coalesce: give further saves a moment to land in the cache
+                    # (and, after a failure, back off before trying again).
+                    self._cond.wait_for(lambda: self._closed, max(self.delay, self._retry_delay))
+                pending, self._pending = self._pending, []
+                clear, self._clear_pending = self._clear_pending, False
+                self._writing = True
+            pending = self._valid_entries(pending)
+            try:
+                if clear:
+                    for p in (self.path, os.path.splitext(self.path)[0] + ".json"):
+                        if os.path.exists(p):
+                            os.remove(p)
+                if pending:
+                    append_entries(self.path, pending)
+                with self._cond:
+                    self._file.set(list(self._entries))
+                    if self._retry_delay:       # recovered from a failed save
+                        self._retry_delay = 0.0
+                        self.error = None
+            except (OSError, LeaderboardFormatError) as e:
+                # Keep the scores in memory and retry later
+                with self._cond:
+                    self._pending[:0] = pending
+                    self._clear_pending = self._clear_pending or clear
+                    closed = self._closed
+                    self._retry_delay = min(max(self._retry_delay * 2, 1.0), MAX_RETRY_DELAY)
+                if closed:
+                    self._report(f"could not save to {self.path} ({e})")
+                    return      # close() reports the scores that were lost
+                self._report(f"could not save to {self.path} ({e}); "
+                             f"retrying in {self._retry_delay:.0f}s")
+            except Exception:
+                # A bug, not a disk problem: retrying would fail the same way
+                self._report(f"dropped {len(pending)} score(s):\n{traceback.format_exc()}")
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+
+    def _valid_entries(self, entries):
+        """Entries that can be stored; the others are reported and dropped."""
+        valid = []
+        for entry in entries:
+            try:
+                check_entry(entry)
+                valid.append(entry)
+            except InvalidEntryError as e:
+                self._report(f"score of {str(entry.get('name'))[:40]!r} not saved: {e}")
+                with self._cond:
+                    if entry in self._entries:
+                        self._entries.remove(entry)
+        return valid
+
+
+_leaderboard_store = None
+
+
+def get_leaderboard_store():
+    """Return the shared store, starting its writer thread on first use."""
+    global _leaderboard_store
+    if _leaderboard_store is None:
+        _leaderboard_store = LeaderboardStore()
+        atexit.register(_leaderboard_store.close)
+    return _leaderboard_store
+
+
+def load_leaderboard():
+    return get_leaderboard_store().entries()
+
 
 def save_score_to_leaderboard(name, score):
-    lb = load_leaderboard()
-    lb.append({"name": name, "score": score, "date": datetime.now().isoformat()})
-    lb = sorted(lb, key=lambda x: x["score"], reverse=True)[:50]
-    with open(LEADERBOARD_FILE, "w", encoding="utf-8") as f:
-        json.dump(lb, f, indent=2)
+    get_leaderboard_store().add(name, score)
 
 # -----------------------------
 # App Class
@@ -67,6 +277,10 @@ class AdditionQuizApp:
         self.current_q = None
         self.hint_used = False
 
+        # Start loading the leaderboard in the background right away
+        get_leaderboard_store()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
         self.main_frame = tk.Frame(self.root)
         self.main_frame.pack(fill="both", expand=True)
 
@@ -195,12 +409,8 @@ class AdditionQuizApp:
 
     def clear_leaderboard_confirm(self):
         if messagebox.askyesno("Clear Leaderboard", "Erase all saved scores?"):
-            try:
-                if os.path.exists(LEADERBOARD_FILE):
-                    os.remove(LEADERBOARD_FILE)
-                messagebox.showinfo("Done", "Leaderboard cleared.")
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+            get_leaderboard_store().clear()
+            messagebox.showinfo("Done", "Leaderboard cleared.")
 
     # -----------------------------
     # QUIZ CONTROL
@@ -416,17 +626,7 @@ class AdditionQuizApp:
                   bg="#ffd7a8", command=self.show_leaderboard).grid(row=0, column=2, padx=6)
 
     def calculate_grade(self):
-        pct = (self.score / (TOTAL_QUESTIONS * 10)) * 100
-        if pct >= 90:
-            return "A+"
-        elif pct >= 80:
-            return "A"
-        elif pct >= 70:
-            return "B"
-        elif pct >= 60:
-            return "C"
-        else:
-            return "D"
+        return grade_for_score(self.score)
 
     # -----------------------------
     # LEADERBOARD
@@ -441,6 +641,11 @@ class AdditionQuizApp:
         tk.Label(frame, text="Leaderboard", font=(self.font_choice[0], 20, "bold"),
                  fg=self.colors["text"], bg=self.colors["panel"]).pack(pady=12)
 
+        error = get_leaderboard_store().error
+        if error:
+            tk.Label(frame, text=f"Warning: {error.splitlines()[0]}", font=(self.font_choice[0], 10),
+                     fg="#b00020", bg=self.colors["panel"], wraplength=420).pack(pady=(0, 6))
+
         lb = load_leaderboard()
         if not lb:
             tk.Label(frame, text="No scores yet.", font=self.font_choice,
@@ -462,11 +667,24 @@ class AdditionQuizApp:
         for w in self.main_frame.winfo_children():
             w.destroy()
 
+    def on_close(self):
+        # Make sure the last score reaches the disk before the window goes away
+        store = get_leaderboard_store()
+        if not store.flush(timeout=5):
+            messagebox.showwarning("Leaderboard", "Your latest score could not be saved:\n"
+                                   f"{(store.error or 'the disk is not responding').splitlines()[0]}")
+        self.root.destroy()
+
 
 # -----------------------------
 # Launch
 # -----------------------------
 if __name__ == "__main__":
     root = tk.Tk()
+    install_stall_monitor(root)
     app = AdditionQuizApp(root)
+    install_memory_profiler(root, {
+        "leaderboard cache": lambda: get_leaderboard_store()._entries or [],
+        "quiz questions": lambda: getattr(app, "questions", []),
+    })
     root.mainloop()
@@ -1,102 +1,196 @@
 import tkinter as tk
-import random
-
-# --- Data Simulation (Updated Jokes with Explanations) ---
-# This big text block is basically our "database" of jokes.
-# Each line is one joke and contains:
-#  setup ? punchline | explanation
-# We later split these lines into usable pieces.
-# Joke structure: Setup?Punchline|Explanation
-JOKE_DATA_WITH_EXPLANATION = """
-
-What do you call an angry carrot?A steamed veggie.|'Steamed' means cooked with steam, but it also means angry.
-Where do polar bears keep their money?In a snowbank.|A snowbank is a pile of snow, but it sounds like “bank.”
-How do you make an egg roll?You push it!|The joke treats “egg roll” literally as rolling an egg.
-What would bears be without bees?Ears.|Remove the letter B from “bears,” you get “ears.”
-What do you call a pile of cats?A meow-ntain.|It’s a pun combining “meow” with “mountain.”
-Why do cows wear bells?Because their horns don’t work.|Cows have horns, but this refers to car horns.
-Why did the bicycle fall over?Because it was two tired.|“Two tired” sounds like “too tired.”
-What did the triangle say to the circle?You’re pointless.|A circle has no points.
-RIP, boiling water.You will be mist.|“Be mist” sounds like “be missed.”
-Time flies like an arrow.Fruit flies like a banana.|Wordplay: first “flies” is a verb, second is a noun.
-I ordered a chicken and an egg online.I’ll let you know what comes first.|Reference to the classic question.
-Why was Cinderella bad at soccer?She kept running away from the ball.|The ball is both a dance party & a soccer ball.
-What do lawyers wear to court?Lawsuits.|A pun: “lawsuit” sounds like “suit.”
-What do elves learn in school?The elf-abet.|Pun on “alphabet.”
-Where was King David’s temple located?Beside his ear.|“Temple” also means part of the head.
-What did one toilet say to another?You look flushed.|Flushed = toilet function + turning red.
-What lights up a soccer stadium?A soccer match.|“Match” = game or something that lights flame.
-What does corn say when it gets a compliment?Aw, shucks!|“Shucks” means modesty and also corn husk.
-What’s the difference between a poorly dressed man on a tricycle and a well-dressed man on a bicycle?Attire.|“Attire” sounds like “a tire.”
-Why did the chicken cross the road?To get to the other side.|Classic anticlimax joke.
-What happens if you boil a clown?You get a laughing stock.|“Laughingstock” is someone mocked; here it’s literal stock.
-Why did the car get a flat tire?Because there was a fork in the road!|“Fork in the road” means a split path, not an actual fork.
-How did the hipster burn his mouth?He ate his pizza before it was cool.|Hipsters like things before they’re “cool.”
-What did the janitor say when he jumped out of the closet?SUPPLIES!!!!|Sounds like “surprise!”
-Have you heard about the band 1023MB?They haven't got a gig yet…|You need 1024MB for a gigabyte.
-Why does the golfer wear two pants?In case he gets a hole-in-one.|Hole-in-one = golf term & pant hole.
-Why should you wear glasses to maths class?It helps with division.|Division = math & dividing vision.
-Why does it take pirates so long to learn the alphabet?They could spend years at C.|“C” sounds like “sea.”
-Why did the woman go on a date with a mushroom?He was a fun-ghi.|Fun guy.
-Why do bananas never get lonely?They hang out in bunches.|Literal bunches.
-What did the buffalo say when his kid went to college?Bison.|Sounds like “bye, son.”
-Why shouldn't you tell secrets in a cornfield?Too many ears.|Corn has “ears.”
-What do you call someone who doesn't like carbs?Lack-Toast Intolerant.|Sounds like lactose intolerant.
-Why did the can crusher quit his job?It was soda pressing.|“So depressing.”
-Why did the birthday boy wrap himself in paper?He wanted to live in the present.|Present = now & wrapped gift.
-What does a house wear?A dress.|House address = “a dress.”
-Why couldn't the toilet paper cross the road?It got stuck in a crack.|Literal crack in pavement.
-Why didn't the bike want to go anywhere?It was two-tired.|Pun on “too tired.”
-Want to hear a pizza joke?Nahhh, it's too cheesy!|Cheesy = corny humour & cheese in pizza.
-Why are chemists great at solving problems?They have all the solutions.|Solutions = answers & chemical mixtures.
-Why is it impossible to starve in the desert?Because of all the sand which is there!|Sandwich = sand which.
-What did the cheese say when it looked in the mirror?Halloumi!|Sounds like “Hello me.”
-Why did the developer go broke?He used up all his cache.|Cache = money stash & computer cache.
-Did you know ants never get sick?They have little antibodies.|Ant bodies.
-Why did the donut go to the dentist?To get a filling.|Donut filling & dental filling.
-What do you call a bear with no teeth?A gummy bear!|Gummy candy & gum-only bear.
-What does a vegan zombie like to eat?Graaains.|Zombies say “brains.”
-What do you call a dinosaur with only one eye?Do-you-think-he-saw-us!|Sounds like “Do you think he saw us?”
-Why should you never fall in love with a tennis player?Love means nothing.|In tennis, “love” = zero.
-What did the full glass say to the empty glass?You look drunk.|Empty glass looks “tipsy.”
-What's a potato's favorite form of transportation?The gravy train.|Gravy train = easy success + gravy.
-What did one ocean say to the other?Nothing, they just waved.|Wave = sea wave & hand wave.
-What did the right eye say to the left eye?Between you and me, something smells.|The nose is between the eyes.
-What do you call a dog run over by a steamroller?Spot!|It becomes flat → a spot.
-What's the difference between a hippo and a zippo?One's heavy, one’s a little lighter.|Lighter = light & small.
-Why don't scientists trust atoms?They make up everything.|Atoms literally make everything.
-"""
-
-
-
-def parse_joke_line(line):
-    """Parses a single line into (setup, punchline, explanation)"""
-    parts = line.strip().split('?', 1)
-    if len(parts) < 2:
-        return None, None, None
-
-    setup = parts[0].strip() + "?"
-    punchline_explanation_str = parts[1].strip()
-
-    # Separate Punchline and Explanation using the '|' delimiter
-    pe_parts = punchline_explanation_str.split('|', 1)
-    punchline = pe_parts[0].strip()
-    explanation = pe_parts[1].strip() if len(pe_parts) > 1 else "No explanation available."
-    
-    return setup, punchline, explanation
-
-def load_jokes_from_data(data):
-    """Reads and parses the joke data."""
-    jokes = []
-    for line in data.strip().split('\n'):
-        if line.strip():
-            setup, punchline, explanation = parse_joke_line(line)
-            if setup and punchline:
-                jokes.append((setup, punchline, explanation))
-    return jokes
-
-# Load the joke data globally
-JOKES = load_jokes_from_data(JOKE_DATA_WITH_EXPLANATION)
+import sys
+import threading
+
+from jokes import (DEDUP_VERSION, JOKE_DATA_WITH_EXPLANATION, RATING_LIMIT, WeightedJokeSampler,
+                   cached_for_corpus, duplicate_ids, joke_source, load_jokes, load_ratings,
+                   load_sessions, measure_cold_start, option_value, resume_joke_bag, save_ratings,
+                   save_sessions)
+from joke_search import load_search_index
+from tk_watchdog import install_from_env as install_stall_monitor
+from mem_profile import install_from_env as install_memory_profiler
+
+# The joke data and everything that works on it (corpus, snapshot, ingest,
+# shuffle bag, duplicates, ratings) live in jokes.py and joke_search.py; this
+# file keeps the app's state and its Tk window.
+
+# --- Joke Search ---
+SEARCH_INDEX = None
+SEARCH_INDEX_BUILD = None   # background thread building SEARCH_INDEX
+
+
+def start_search_index_build():
+    """Build (or load) the search index on a background thread."""
+    global SEARCH_INDEX_BUILD
+    if SEARCH_INDEX is not None or SEARCH_INDEX_BUILD is not None:
+        return
+    jokes = get_jokes()
+
+    def build():
+        global SEARCH_INDEX
+        index = load_search_index(jokes)
+        if JOKES is jokes:              # not replaced by init_jokes meanwhile
+            SEARCH_INDEX = index
+
+    SEARCH_INDEX_BUILD = threading.Thread(target=build, name="joke-search-index", daemon=True)
+    SEARCH_INDEX_BUILD.start()
+
+
+def get_search_index():
+    """The joke search index (extended if JOKES grew), or None while it is built."""
+    if SEARCH_INDEX is None:
+        start_search_index_build()
+        return None
+    jokes = get_jokes()
+    for joke_id in range(SEARCH_INDEX.count, len(jokes)):
+        SEARCH_INDEX.add(joke_id, jokes[joke_id])
+    return SEARCH_INDEX
+
+
+# --- Near-duplicate Jokes ---
+DUPLICATE_IDS = None
+DUPLICATE_SCAN = None       # background thread finding DUPLICATE_IDS
+
+
+def start_duplicate_scan():
+    """Find the duplicates on a background thread, so no click waits for them."""
+    global DUPLICATE_SCAN
+    if DUPLICATE_IDS is not None or DUPLICATE_SCAN is not None:
+        return
+    jokes = get_jokes()
+
+    def scan():
+        global DUPLICATE_IDS, JOKE_SAMPLER
+        ids = cached_for_corpus(jokes, ".dups", DEDUP_VERSION, duplicate_ids)
+        if JOKES is jokes:              # not replaced by init_jokes meanwhile
+            DUPLICATE_IDS = ids
+            JOKE_SAMPLER = None         # rebuilt without the duplicates on the next draw
+
+    DUPLICATE_SCAN = threading.Thread(target=scan, name="joke-dedup", daemon=True)
+    DUPLICATE_SCAN.start()
+
+
+def get_duplicate_ids():
+    """Duplicate ids to skip; empty until the background scan has finished."""
+    if DUPLICATE_IDS is None:
+        start_duplicate_scan()
+    return DUPLICATE_IDS or frozenset()
+
+
+# --- Joke Ratings ---
+RATINGS = None
+JOKE_SAMPLER = None
+
+
+def get_ratings():
+    global RATINGS
+    if RATINGS is None:
+        RATINGS = load_ratings(get_jokes(), JOKES_SOURCE)
+    return RATINGS
+
+
+def get_joke_sampler():
+    global JOKE_SAMPLER
+    if JOKE_SAMPLER is None:
+        JOKE_SAMPLER = WeightedJokeSampler(len(get_jokes()), get_ratings(), get_duplicate_ids())
+    return JOKE_SAMPLER
+
+
+def rate_joke(joke_id, liked):
+    """Records a thumbs up/down; the ratings are saved shortly after."""
+    ups, downs = get_ratings().setdefault(joke_id, [0, 0])
+    if liked:
+        ups = min(ups + 1, RATING_LIMIT)
+    else:
+        downs = min(downs + 1, RATING_LIMIT)
+    RATINGS[joke_id] = [ups, downs]
+    get_joke_sampler().set_rating(joke_id, ups, downs)
+    schedule_save("ratings")
+    return ups, downs
+
+
+# --- Saving ---
+# Telling or rating a joke only changes the state in memory. The files are
+# written at most once every SAVE_DELAY_MS and when the app closes, so a run
+# of clicks costs one write instead of a read, a write and an fsync each.
+SAVE_DELAY_MS = 2000
+SESSIONS = None         # joke source -> shuffle bag state, as in SESSION_FILE
+UNSAVED = set()         # "session" and/or "ratings"
+SAVE_JOB = None         # pending after() call to save_now
+root_window = None      # set by build_gui; without a window, saves happen at once
+
+
+def get_sessions():
+    global SESSIONS
+    if SESSIONS is None:
+        SESSIONS = load_sessions()
+    return SESSIONS
+
+
+def schedule_save(what):
+    """Marks `what` as changed and makes sure a save is coming."""
+    global SAVE_JOB
+    UNSAVED.add(what)
+    if root_window is None:
+        save_now()
+    elif SAVE_JOB is None:
+        SAVE_JOB = root_window.after(SAVE_DELAY_MS, save_now)
+
+
+def save_now():
+    """Writes whatever changed since the last save."""
+    global SAVE_JOB
+    if SAVE_JOB is not None:
+        try:
+            root_window.after_cancel(SAVE_JOB)
+        except tk.TclError:
+            pass  # the window is already gone
+        SAVE_JOB = None
+    if "session" in UNSAVED:
+        save_sessions(get_sessions())
+    if "ratings" in UNSAVED and RATINGS is not None:
+        save_ratings(RATINGS, JOKES, JOKES_SOURCE)
+    UNSAVED.clear()
+
+
+# The joke data is loaded on first use (or by main), not when the module is
+# imported, so other code can import these functions without any cost.
+JOKES = None
+JOKES_SOURCE = None
+JOKE_BAG = None
+
+
+def init_jokes(argv=()):
+    """Loads the jokes picked by the command line options."""
+    global JOKES, JOKES_SOURCE, JOKE_BAG, SEARCH_INDEX, SEARCH_INDEX_BUILD
+    global DUPLICATE_IDS, DUPLICATE_SCAN, RATINGS, JOKE_SAMPLER
+    save_now()      # changes belong to the jokes loaded until now
+    JOKES = load_jokes(list(argv))
+    JOKES_SOURCE = joke_source(list(argv))
+    JOKE_BAG = None
+    SEARCH_INDEX = None
+    SEARCH_INDEX_BUILD = None
+    RATINGS = None
+    JOKE_SAMPLER = None
+    DUPLICATE_IDS = frozenset() if "--keep-duplicates" in argv else None
+    DUPLICATE_SCAN = None
+    return JOKES
+
+
+def get_jokes():
+    if JOKES is None:
+        init_jokes()
+    return JOKES
+
+
+def get_joke_bag():
+    """The shuffle bag for the current jokes, resumed from the last session."""
+    global JOKE_BAG
+    if JOKE_BAG is None:
+        JOKE_BAG = resume_joke_bag(len(get_jokes()), get_sessions().get(JOKES_SOURCE))
+    return JOKE_BAG
+
+CURRENT_JOKE_ID = None      # Joke on screen (for rating it)
 CURRENT_PUNCHLINE = ""      # Stores the punchline
 CURRENT_EXPLANATION = ""    # Stores the explanation
 
@@ -117,10 +211,9 @@ COLOR_BTN_QUIT = "#E53935"    # Red - Danger/Exit
 # --- GUI Logic Functions ---
 
 def tell_joke():
-    """Randomly selects a joke, displays the setup, and resets the punchline/explanation display."""
-    global CURRENT_PUNCHLINE, CURRENT_EXPLANATION
+    """Picks the next random joke and displays it."""
     
-    if not JOKES:
+    if not get_jokes():
         setup_label.config(text="Sorry, no jokes loaded.", fg=COLOR_TEXT_PUNCHLINE)
         punchline_label.config(text="")
         explanation_label.config(text="")
@@ -128,8 +221,26 @@ def tell_joke():
         show_explanation_btn.config(state=tk.DISABLED)
         return
         
-    # 1. Randomly select a joke (now with 3 elements)
-    setup, punchline, explanation = random.choice(JOKES)
+    # 1. Pick the next joke: weighted by ratings if asked for, otherwise from the
+    #    shuffle bag (no repeats until all are told). Both skip reworded copies.
+    if favour_rated_var.get():
+        joke_id = get_joke_sampler().draw()
+    else:
+        bag = get_joke_bag()
+        duplicates = get_duplicate_ids()
+        joke_id = bag.next()
+        while joke_id in duplicates:
+            joke_id = bag.next()
+        get_sessions()[JOKES_SOURCE] = bag.state()
+        schedule_save("session")
+    show_joke(joke_id)
+
+def show_joke(joke_id):
+    """Displays the setup of one joke and resets the punchline/explanation display."""
+    global CURRENT_JOKE_ID, CURRENT_PUNCHLINE, CURRENT_EXPLANATION
+
+    setup, punchline, explanation = get_jokes()[joke_id]
+    CURRENT_JOKE_ID = joke_id
     CURRENT_PUNCHLINE = punchline
     CURRENT_EXPLANATION = explanation
     
@@ -144,6 +255,9 @@ def tell_joke():
     show_punchline_btn.config(state=tk.NORMAL)
     show_explanation_btn.config(state=tk.DISABLED) # Keep disabled until punchline is shown
     next_joke_btn.config(state=tk.NORMAL)
+    like_btn.config(state=tk.NORMAL)
+    dislike_btn.config(state=tk.NORMAL)
+    show_rating()
 
 def show_punchline():
     """Displays the punchline and enables the explanation button."""
@@ -159,109 +273,234 @@ def show_explanation():
     explanation_label.config(text=f"*** THE HUMOR ***\n{CURRENT_EXPLANATION}", fg=COLOR_TEXT_EXPLANATION)
     show_explanation_btn.config(state=tk.DISABLED) # Disable after showing
 
+def show_rating():
+    ups, downs = get_ratings().get(CURRENT_JOKE_ID, (0, 0))
+    rating_label.config(text=f"{ups} 👍  {downs} 👎")
+
+def rate_current_joke(liked):
+    """Saves a thumbs up/down for the joke on screen."""
+    if CURRENT_JOKE_ID is None:
+        return
+    rate_joke(CURRENT_JOKE_ID, liked)
+    show_rating()
+
+SEARCH_RESULTS = []     # joke ids currently listed in the results box
+SEARCH_DELAY_MS = 150   # search once typing pauses this long
+SEARCH_JOB = None       # pending after() call to run_search
+
+def search_jokes(*args):
+    """Runs the search shortly after the search box stops changing."""
+    global SEARCH_JOB
+    if SEARCH_JOB is not None:
+        root_window.after_cancel(SEARCH_JOB)
+    SEARCH_JOB = root_window.after(SEARCH_DELAY_MS, run_search)
+
+def run_search():
+    """Lists the jokes matching the search box."""
+    global SEARCH_RESULTS, SEARCH_JOB
+    SEARCH_JOB = None
+    query = search_var.get()
+    results_list.delete(0, tk.END)
+    SEARCH_RESULTS = []
+    if not query.strip():
+        return
+    index = get_search_index()
+    if index is None:
+        # Still being built in the background: say so and try again shortly
+        results_list.insert(tk.END, "Indexing jokes…")
+        SEARCH_JOB = root_window.after(SEARCH_DELAY_MS, run_search)
+        return
+    SEARCH_RESULTS = index.search(query)
+    for joke_id in SEARCH_RESULTS:
+        results_list.insert(tk.END, get_jokes()[joke_id][0])
+
+def open_search_result(_evt):
+    """Shows the joke picked in the results box."""
+    selection = results_list.curselection()
+    if selection and selection[0] < len(SEARCH_RESULTS):
+        show_joke(SEARCH_RESULTS[selection[0]])
+
 # --- Tkinter Setup ---
 
-# Initialize the main window
-root = tk.Tk()
-root.title("Alexa Joke Explainer Assistant")
-root.geometry("550x480")
-# Set the main window background color to Light Cyan
-root.configure(bg=COLOR_BG_ROOT) 
-root.resizable(False, False)
-
-# Main container frame (set to White for contrast)
-main_frame = tk.Frame(root, bg=COLOR_BG_MAIN, padx=15, pady=15, bd=5, relief=tk.RAISED) 
-main_frame.pack(expand=True, fill=tk.BOTH, padx=20, pady=20)
-
-# --- Title/Header ---
-tk.Label(main_frame, 
-         text="🎙️ JOKE EXPLAINER ASSISTANT 💡", 
-         font=("Arial", 18, "bold"), 
-         bg=COLOR_BG_MAIN, 
-         fg="#37474F").pack(pady=(5, 15))
-
-
-# 1. Joke Setup Label (Question)
-setup_label = tk.Label(main_frame, 
-                       text="Press 'Alexa tell me a Joke' to begin!", 
-                       font=("Arial", 16, "italic"), 
-                       bg=COLOR_BG_MAIN, 
-                       fg=COLOR_TEXT_SETUP,
-                       wraplength=500, 
-                       justify=tk.CENTER)
-setup_label.pack(pady=(10, 10), fill=tk.X)
-
-# 2. Punchline Label
-punchline_label = tk.Label(main_frame, 
-                          text="", 
-                          font=("Arial", 18, "bold"), 
-                          bg=COLOR_BG_MAIN, 
-                          fg=COLOR_TEXT_PUNCHLINE, 
-                          wraplength=500,
-                          justify=tk.CENTER)
-punchline_label.pack(pady=10, fill=tk.X)
-
-# 3. Explanation Label
-explanation_label = tk.Label(main_frame, 
-                             text="", 
-                             font=("Arial", 10), 
-                             bg=COLOR_BG_EXPLANATION, 
-                             fg=COLOR_TEXT_EXPLANATION, 
-                             wraplength=500,
-                             justify=tk.LEFT, 
-                             pady=10, padx=10, bd=2, relief=tk.GROOVE) 
-explanation_label.pack(pady=15, fill=tk.X)
-
-# --- Button Frame (uses main frame's background) ---
-button_frame = tk.Frame(main_frame, bg=COLOR_BG_MAIN)
-button_frame.pack(pady=10)
-
-# Alexa Joke Button
-alexa_joke_btn = tk.Button(button_frame, 
-                           text="🤖 Alexa tell me a Joke", 
-                           command=tell_joke, 
-                           font=("Arial", 12, "bold"),
-                           bg=COLOR_BTN_ALEXA, fg="white", padx=10, pady=5)
-alexa_joke_btn.pack(side=tk.LEFT, padx=5)
-
-# Show Punchline Button
-show_punchline_btn = tk.Button(button_frame, 
-                               text="❓ Show Punchline", 
-                               command=show_punchline, 
-                               font=("Arial", 12),
-                               bg=COLOR_BTN_PUNCHLINE, fg="white", padx=10, pady=5,
-                               state=tk.DISABLED)
-show_punchline_btn.pack(side=tk.LEFT, padx=5)
-
-# Show Explanation Button
-show_explanation_btn = tk.Button(button_frame, 
-                                 text=" Explain", 
-                                 command=show_explanation, 
-                                 font=("Arial", 12),
-                                 bg=COLOR_BTN_EXPLAIN, fg="white", padx=10, pady=5,
-                                 state=tk.DISABLED)
-show_explanation_btn.pack(side=tk.LEFT, padx=5)
-
-# --- Control Buttons (uses main window's background) ---
-control_frame = tk.Frame(root, bg=COLOR_BG_ROOT)
-control_frame.pack(fill=tk.X, pady=5)
-
-# Next Joke Button
-next_joke_btn = tk.Button(control_frame, 
-                          text="➡️ Next Joke", 
-                          command=tell_joke, 
-                          font=("Arial", 12),
-                          bg="#64B5F6", fg="white", padx=10, pady=5,
-                          state=tk.DISABLED)
-next_joke_btn.pack(side=tk.LEFT, padx=(15, 5), pady=5)
-
-# Quit Button
-quit_btn = tk.Button(control_frame, 
-                     text="❌ Quit Application", 
-                     command=root.quit, 
-                     font=("Arial", 12),
-                     bg=COLOR_BTN_QUIT, fg="white", padx=10, pady=5)
-quit_btn.pack(side=tk.RIGHT, padx=(5, 15), pady=5)
-
-# Keep the app running 
-root.mainloop() 
\ No newline at end of file
+def build_gui(root):
+    """Builds every widget of the app inside `root`."""
+    global setup_label, punchline_label, explanation_label
+    global show_punchline_btn, show_explanation_btn, next_joke_btn
+    global search_var, results_list
+    global like_btn, dislike_btn, rating_label, favour_rated_var
+    global root_window
+
+    root_window = root
+    root.title("Alexa Joke Explainer Assistant")
+    root.geometry("550x680")
+    # Set the main window background color to Light Cyan
+    root.configure(bg=COLOR_BG_ROOT) 
+    root.resizable(False, False)
+
+    # Main container frame (set to White for contrast)
+    main_frame = tk.Frame(root, bg=COLOR_BG_MAIN, padx=15, pady=15, bd=5, relief=tk.RAISED) 
+    main_frame.pack(expand=True, fill=tk.BOTH, padx=20, pady=20)
+
+    # --- Title/Header ---
+    tk.Label(main_frame, 
+             text="🎙️ JOKE EXPLAINER ASSISTANT 💡", 
+             font=("Arial", 18, "bold"), 
+             bg=COLOR_BG_MAIN, 
+             fg="#37474F").pack(pady=(5, 15))
+
+
+    # 1. Joke Setup Label (Question)
+    setup_label = tk.Label(main_frame, 
+                           text="Press 'Alexa tell me a Joke' to begin!", 
+                           font=("Arial", 16, "italic"), 
+                           bg=COLOR_BG_MAIN, 
+                           fg=COLOR_TEXT_SETUP,
+                           wraplength=500, 
+                           justify=tk.CENTER)
+    setup_label.pack(pady=(10, 10), fill=tk.X)
+
+    # 2. Punchline Label
+    punchline_label = tk.Label(main_frame, 
+                              text="", 
+                              font=("Arial", 18, "bold"), 
+                              bg=COLOR_BG_MAIN, 
+                              fg=COLOR_TEXT_PUNCHLINE, 
+                              wraplength=500,
+                              justify=tk.CENTER)
+    punchline_label.pack(pady=10, fill=tk.X)
+
+    # 3. Explanation Label
+    explanation_label = tk.Label(main_frame, 
+                                 text="", 
+                                 font=("Arial", 10), 
+                                 bg=COLOR_BG_EXPLANATION, 
+                                 fg=COLOR_TEXT_EXPLANATION, 
+                                 wraplength=500,
+                                 justify=tk.LEFT, 
+                                 pady=10, padx=10, bd=2, relief=tk.GROOVE) 
+    explanation_label.pack(pady=15, fill=tk.X)
+
+    # --- Button Frame (uses main frame's background) ---
+    button_frame = tk.Frame(main_frame, bg=COLOR_BG_MAIN)
+    button_frame.pack(pady=10)
+
+    # Alexa Joke Button
+    alexa_joke_btn = tk.Button(button_frame, 
+                               text="🤖 Alexa tell me a Joke", 
+                               command=tell_joke, 
+                               font=("Arial", 12, "bold"),
+                               bg=COLOR_BTN_ALEXA, fg="white", padx=10, pady=5)
+    alexa_joke_btn.pack(side=tk.LEFT, padx=5)
+
+    # Show Punchline Button
+    show_punchline_btn = tk.Button(button_frame, 
+                                   text="❓ Show Punchline", 
+                                   command=show_punchline, 
+                                   font=("Arial", 12),
+                                   bg=COLOR_BTN_PUNCHLINE, fg="white", padx=10, pady=5,
+                                   state=tk.DISABLED)
+    show_punchline_btn.pack(side=tk.LEFT, padx=5)
+
+    # Show Explanation Button
+    show_explanation_btn = tk.Button(button_frame, 
+                                     text=" Explain", 
+                                     command=show_explanation, 
+                                     font=("Arial", 12),
+                                     bg=COLOR_BTN_EXPLAIN, fg="white", padx=10, pady=5,
+                                     state=tk.DISABLED)
+    show_explanation_btn.pack(side=tk.LEFT, padx=5)
+
+    # --- Rating Row (uses main frame's background) ---
+    rating_frame = tk.Frame(main_frame, bg=COLOR_BG_MAIN)
+    rating_frame.pack(pady=(0, 5))
+
+    like_btn = tk.Button(rating_frame, text="👍", command=lambda: rate_current_joke(True),
+                         font=("Arial", 11), state=tk.DISABLED)
+    like_btn.pack(side=tk.LEFT, padx=3)
+    dislike_btn = tk.Button(rating_frame, text="👎", command=lambda: rate_current_joke(False),
+                            font=("Arial", 11), state=tk.DISABLED)
+    dislike_btn.pack(side=tk.LEFT, padx=3)
+    rating_label = tk.Label(rating_frame, text="", font=("Arial", 10), bg=COLOR_BG_MAIN, fg="#37474F")
+    rating_label.pack(side=tk.LEFT, padx=8)
+
+    # Off by default: weighted draws can repeat jokes, the shuffle bag never does
+    favour_rated_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(rating_frame, text="Favour top-rated jokes", variable=favour_rated_var,
+                   bg=COLOR_BG_MAIN, font=("Arial", 10)).pack(side=tk.LEFT, padx=3)
+
+    # --- Search Box (uses main frame's background) ---
+    search_frame = tk.Frame(main_frame, bg=COLOR_BG_MAIN)
+    search_frame.pack(fill=tk.X, pady=(5, 0))
+
+    tk.Label(search_frame, text="🔍 Search jokes:", font=("Arial", 11),
+             bg=COLOR_BG_MAIN, fg="#37474F").pack(anchor="w")
+
+    search_var = tk.StringVar()
+    search_var.trace("w", search_jokes)
+    search_entry = tk.Entry(search_frame, textvariable=search_var, font=("Arial", 11))
+    search_entry.pack(fill=tk.X, pady=(2, 4))
+
+    results_list = tk.Listbox(search_frame, height=4, font=("Arial", 10), activestyle="none")
+    results_list.pack(fill=tk.X)
+    results_list.bind("<<ListboxSelect>>", open_search_result)
+
+    # --- Control Buttons (uses main window's background) ---
+    control_frame = tk.Frame(root, bg=COLOR_BG_ROOT)
+    control_frame.pack(fill=tk.X, pady=5)
+
+    # Next Joke Button
+    next_joke_btn = tk.Button(control_frame, 
+                              text="➡️ Next Joke", 
+                              command=tell_joke, 
+                              font=("Arial", 12),
+                              bg="#64B5F6", fg="white", padx=10, pady=5,
+                              state=tk.DISABLED)
+    next_joke_btn.pack(side=tk.LEFT, padx=(15, 5), pady=5)
+
+    # Quit Button
+    quit_btn = tk.Button(control_frame, 
+                         text="❌ Quit Application", 
+                         command=root.quit, 
+                         font=("Arial", 12),
+                         bg=COLOR_BTN_QUIT, fg="white", padx=10, pady=5)
+    quit_btn.pack(side=tk.RIGHT, padx=(5, 15), pady=5)
+
+
+def run_cache_benchmark(path=None):
+    """Prints start-up timings with and without the parsed-joke snapshot."""
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            bench_data = f.read()
+    else:
+        bench_data = JOKE_DATA_WITH_EXPLANATION
+    for key, value in measure_cold_start(bench_data).items():
+        print(f"{key:>14}: {value:.6f}" if isinstance(value, float) else f"{key:>14}: {value}")
+
+
+def main(argv=None):
+    """Entry point, see load_jokes for the joke options; `--bench-cache [FILE]` only times start-up."""
+    argv = sys.argv[1:] if argv is None else argv
+    if "--bench-cache" in argv:
+        run_cache_benchmark(option_value(argv, "--bench-cache"))
+        return
+
+    init_jokes(argv)
+    start_duplicate_scan()
+    start_search_index_build()
+    root = tk.Tk()
+    install_stall_monitor(root)
+    install_memory_profiler(root, {
+        "jokes": lambda: JOKES if JOKES is not None else [],
+        "search index": lambda: SEARCH_INDEX,
+        "duplicate ids": lambda: DUPLICATE_IDS or frozenset(),
+        "ratings": lambda: RATINGS or {},
+        "weighted sampler": lambda: JOKE_SAMPLER,
+    })
+    build_gui(root)
+    # Keep the app running
+    root.mainloop()
+    save_now()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 import os
+import csv
+import json
+import html
 
-FILE_PATH = "studentMarks.txt"
+from tk_watchdog import install_from_env as install_stall_monitor
+from mem_profile import install_from_env as install_memory_profiler
+from codelab_data import CachedFile, atomic_write, data_path, poll_file
+
+FILE_PATH = data_path("studentMarks.txt")
 
 # ----------------------- THEMES -----------------------
 
@@ -69,18 +76,19 @@ def toggle_theme():
 
 # ----------------------- Helper Functions -----------------------
 
-def load_students():
-    students = []
-    if not os.path.exists(FILE_PATH):
-        return students
+def iter_students(path=None):
+    """Yield students one at a time straight from the file"""
+    path = path or FILE_PATH
+    if not os.path.exists(path):
+        return
 
-    with open(FILE_PATH, "r") as f:
-        lines = f.readlines()
-        for line in lines[1:]:
+    with open(path, "r") as f:
+        next(f, None)  # first line is the student count
+        for line in f:
             parts = line.strip().split(",")
             if len(parts) < 7:
                 continue
-            s = {
+            yield {
                 "code": parts[0],
                 "name": parts[1],
                 "course1": int(parts[2]),
@@ -89,15 +97,26 @@ def load_students():
                 "exam": int(parts[5]),
                 "attendance": int(parts[6])
             }
-            students.append(s)
-    return students
+
+
+# Parsed once, then re-read only when the file's mtime or size changes
+students_file = CachedFile(FILE_PATH, lambda path: list(iter_students(path)), errors=())
+
+
+def load_students():
+    # Callers edit the list before saving, so hand out a copy of the cache
+    return [dict(s) for s in students_file.get()]
+
+
+def write_students(f, students):
+    f.write(f"{len(students)}\n")
+    for s in students:
+        f.write(f"{s['code']},{s['name']},{s['course1']},{s['course2']},{s['course3']},{s['exam']},{s['attendance']}\n")
 
 
 def save_students(students):
-    with open(FILE_PATH, "w") as f:
-        f.write(f"{len(students)}\n")
-        for s in students:
-            f.write(f"{s['code']},{s['name']},{s['course1']},{s['course2']},{s['course3']},{s['exam']},{s['attendance']}\n")
+    atomic_write(FILE_PATH, lambda f: write_students(f, students))
+    students_file.set([dict(s) for s in students])
 
 
 def total_coursework(s):
@@ -121,6 +140,219 @@ def grade(s):
     else: return "F"
 
 
+# ----------------------- RANKINGS -----------------------
+
+class ScoreRanks:
+    """Counts of students per whole-mark score in a Fenwick tree.
+
+    Adding, removing and ranking a score are all O(log max_score), so the
+    rank stays current through edits without sorting the class.
+    """
+
+    def __init__(self, max_score):
+        self.max_score = max_score
+        self.tree = [0] * (max_score + 2)
+        self.count = 0
+
+    def _bucket(self, score):
+        return min(max(int(score), 0), self.max_score) + 1
+
+    def _change(self, score, delta):
+        i = self._bucket(score)
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+        self.count += delta
+
+    def add(self, score):
+        self._change(score, 1)
+
+    def remove(self, score):
+        self._change(score, -1)
+
+    def count_at_most(self, score):
+        i, total = self._bucket(score), 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def rank(self, score):
+        """1 + number of students with a strictly higher score"""
+        return self.count - self.count_at_most(score) + 1
+
+    def describe(self, score):
+        rank = self.rank(score)
+        top = rank / self.count * 100 if self.count else 0
+        return f"Rank {rank} of {self.count:,} (top {top:.1f}%)"
+
+
+RANKED_SCORES = {
+    "overall": (160, overall_total),   # same order as overall percentage
+    "exam": (100, lambda s: s["exam"]),
+}
+ranks = None
+
+
+def rebuild_ranks(students):
+    global ranks
+    ranks = {key: ScoreRanks(top) for key, (top, _) in RANKED_SCORES.items()}
+    for s in students:
+        add_to_ranks(s)
+
+
+def get_ranks():
+    if ranks is None:
+        rebuild_ranks(iter_students())
+    return ranks
+
+
+# Called after a change is saved. If the ranks were never built, the next
+# get_ranks() reads the saved file with the change already in it, so there is
+# nothing to update (doing so would count the student twice).
+def add_to_ranks(s):
+    if ranks is not None:
+        for key, (_, score) in RANKED_SCORES.items():
+            ranks[key].add(score(s))
+
+
+def remove_from_ranks(s):
+    if ranks is not None:
+        for key, (_, score) in RANKED_SCORES.items():
+            ranks[key].remove(score(s))
+
+
+# ----------------------- REPORT EXPORT -----------------------
+
+REPORT_COLUMNS = (
+    "Code", "Name", "C1", "C2", "C3", "Exam",
+    "Coursework", "Total", "%", "Grade", "Attendance"
+)
+
+
+def report_row(s):
+    """One student's row as shown in the table and written to reports"""
+    return (
+        s["code"],
+        s["name"],
+        s["course1"], s["course2"], s["course3"],
+        s["exam"],
+        total_coursework(s),
+        overall_total(s),
+        f"{overall_percentage(s):.2f}",
+        grade(s),
+        f"{s['attendance']}%"
+    )
+
+
+class CsvReportWriter:
+    def __init__(self, f):
+        self.writer = csv.writer(f)
+        self.writer.writerow(REPORT_COLUMNS)
+
+    def write(self, s):
+        self.writer.writerow(report_row(s))
+
+    def close(self):
+        pass
+
+
+class JsonLinesReportWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, s):
+        self.f.write(json.dumps(dict(zip(REPORT_COLUMNS, report_row(s)))) + "\n")
+
+    def close(self):
+        pass
+
+
+class HtmlReportWriter:
+    """Writes the table row by row; the class summary goes in the footer"""
+
+    def __init__(self, f, title="Student Report"):
+        self.f = f
+        self.count = 0
+        self.pct_sum = 0.0
+        f.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>\n"
+                "<style>table{border-collapse:collapse}td,th{border:1px solid #999;padding:2px 6px}</style>\n"
+                f"</head><body>\n<h1>{html.escape(title)}</h1>\n<table>\n<tr>"
+                + "".join(f"<th>{html.escape(c)}</th>" for c in REPORT_COLUMNS) + "</tr>\n")
+
+    def write(self, s):
+        self.count += 1
+        self.pct_sum += overall_percentage(s)
+        self.f.write("<tr>" + "".join(f"<td>{html.escape(str(v))}</td>" for v in report_row(s)) + "</tr>\n")
+
+    def close(self):
+        average = self.pct_sum / self.count if self.count else 0
+        self.f.write(f"</table>\n<p>Students: {self.count} &mdash; Average percentage: {average:.2f}%</p>\n"
+                     "</body></html>\n")
+
+
+REPORT_WRITERS = {
+    ".csv": CsvReportWriter,
+    ".jsonl": JsonLinesReportWriter,
+    ".html": HtmlReportWriter,
+}
+
+
+def export_report(out_path, split_by_grade=False, source=None):
+    """Stream students from the file through the grading functions into a report.
+
+    The format comes from the file extension (.csv, .jsonl or .html). Only one
+    student is in memory at a time. With split_by_grade one file is written
+    per grade band (report_A.csv, report_B.csv, ...). Returns {path: rows}.
+    """
+    stem, ext = os.path.splitext(out_path)
+    ext = ext.lower()
+    if ext not in REPORT_WRITERS:
+        raise ValueError(f"Unsupported report format: {ext or out_path}")
+
+    files, writers, counts = {}, {}, {}
+
+    def writer_for(band):
+        if band not in writers:
+            path = f"{stem}_{band}{ext}" if band else out_path
+            files[band] = open(path, "w", encoding="utf-8", newline="")
+            writers[band] = (REPORT_WRITERS[ext](files[band]), path)
+            counts[path] = 0
+        return writers[band]
+
+    try:
+        if not split_by_grade:
+            writer_for(None)  # written even when there are no students
+        for s in iter_students(source):
+            writer, path = writer_for(grade(s) if split_by_grade else None)
+            writer.write(s)
+            counts[path] += 1
+        for writer, _ in writers.values():
+            writer.close()
+    finally:
+        for f in files.values():
+            f.close()
+    return counts
+
+
+def export_report_dialog():
+    out_path = filedialog.asksaveasfilename(
+        title="Export Report",
+        defaultextension=".csv",
+        filetypes=[("CSV", "*.csv"), ("JSON lines", "*.jsonl"), ("HTML", "*.html")],
+    )
+    if not out_path:
+        return
+    split = messagebox.askyesno("Export Report", "Write a separate report for each grade band?")
+    try:
+        counts = export_report(out_path, split_by_grade=split)
+    except (OSError, ValueError) as e:
+        messagebox.showerror("Error", str(e))
+        return
+    summary = "\n".join(f"{os.path.basename(p)}: {n} students" for p, n in counts.items())
+    messagebox.showinfo("Exported", summary or "No students to export.")
+
+
 # ----------------------- TABLE VIEW -----------------------
 
 def update_table(students):
@@ -128,18 +360,30 @@ def update_table(students):
         table.delete(row)
 
     for s in students:
-        table.insert("", "end",
-                     values=(
-                         s["code"],
-                         s["name"],
-                         s["course1"], s["course2"], s["course3"],
-                         s["exam"],
-                         total_coursework(s),
-                         overall_total(s),
-                         f"{overall_percentage(s):.2f}",
-                         grade(s),
-                         f"{s['attendance']}%"
-                     ))
+        # Rows are keyed by student code so single rows can be changed later
+        iid = s["code"] if not table.exists(s["code"]) else None
+        table.insert("", "end", iid=iid, values=report_row(s))
+
+
+def matches_search(s):
+    query = search_var.get().lower()
+    return query in s["name"].lower() or query in s["code"].lower()
+
+
+def show_student_row(s):
+    """Insert or refresh one student's row, respecting the current search"""
+    code = s["code"]
+    if not matches_search(s):
+        remove_student_row(code)
+    elif table.exists(code):
+        table.item(code, values=report_row(s))
+    else:
+        table.insert("", "end", iid=code, values=report_row(s))
+
+
+def remove_student_row(code):
+    if table.exists(code):
+        table.delete(code)
 
 
 # ----------------------- STUDENT DASHBOARD -----------------------
@@ -161,7 +405,9 @@ def open_dashboard(student):
         f"Overall Total: {overall_total(student)} / 160\n"
         f"Percentage: {overall_percentage(student):.2f}%\n"
         f"Grade: {grade(student)}\n"
-        f"Attendance: {student['attendance']}%"
+        f"Attendance: {student['attendance']}%\n"
+        f"Overall: {get_ranks()['overall'].describe(overall_total(student))}\n"
+        f"Exam: {get_ranks()['exam'].describe(student['exam'])}"
     )
 
     tk.Label(summary, text=info, justify="left", font=("Arial", 11)).pack(padx=10, pady=10)
@@ -195,14 +441,20 @@ def open_dashboard(student):
 # ----------------------- GUI FUNCTIONS -----------------------
 
 def view_all():
-    update_table(load_students())
+    students = load_students()
+    rebuild_ranks(students)
+    update_table(students)
 
 
 def search_student(*args):
-    query = search_var.get().lower()
+    update_table([s for s in load_students() if matches_search(s)])
+
+
+def reload_students():
+    """The file was changed elsewhere: reload it, keeping the search filter"""
     students = load_students()
-    results = [s for s in students if query in s["name"].lower() or query in s["code"].lower()]
-    update_table(results)
+    rebuild_ranks(students)
+    update_table([s for s in students if matches_search(s)])
 
 
 def view_individual():
@@ -233,14 +485,16 @@ def add_student():
     exam = int(simpledialog.askstring("Exam (0–100)", "Enter mark:"))
     attendance = int(simpledialog.askstring("Attendance %", "Enter %:"))
 
-    students.append({
+    student = {
         "code": code, "name": name,
         "course1": c1, "course2": c2, "course3": c3,
         "exam": exam, "attendance": attendance
-    })
+    }
+    students.append(student)
 
     save_students(students)
-    view_all()
+    add_to_ranks(student)
+    show_student_row(student)
     messagebox.showinfo("Success", "Student added!")
 
 
@@ -252,12 +506,16 @@ def delete_student():
     if student:
         students.remove(student)
         save_students(students)
-        view_all()
+        remove_from_ranks(student)
+        remove_student_row(code)
         messagebox.showinfo("Deleted", "Student removed.")
     else:
         messagebox.showerror("Error", "Student not found.")
 
 
+UPDATABLE_FIELDS = ("name", "course1", "course2", "course3", "exam", "attendance")
+
+
 def update_student():
     students = load_students()
     code = simpledialog.askstring("Update Student", "Enter student code:")
@@ -267,68 +525,98 @@ def update_student():
         messagebox.showerror("Error", "Student not found!")
         return
 
-    field = simpledialog.askstring("Field", "name, course1, course2, course3, exam, attendance")
-    if field not in s:
+    # The code is the row's key in the table, so it cannot be changed here
+    field = simpledialog.askstring("Field", ", ".join(UPDATABLE_FIELDS))
+    if field not in UPDATABLE_FIELDS:
         messagebox.showerror("Error", "Invalid field.")
         return
 
     new_val = simpledialog.askstring("New Value", f"Enter new value for {field}:")
+    old = dict(s)
     s[field] = int(new_val) if field != "name" else new_val
 
     save_students(students)
-    view_all()
+    remove_from_ranks(old)
+    add_to_ranks(s)
+    show_student_row(s)
     messagebox.showinfo("Updated", "Student updated.")
 
 
 # ------------------------- MAIN GUI -------------------------
 
-root = tk.Tk()
-root.title("Student Manager")
-root.geometry("1100x600")
+root = None
+table = None
+search_var = None
+options_menu = None
 
-apply_theme(root)
 
-# --- Search bar ---
-search_var = tk.StringVar()
-search_var.trace("w", search_student)
+def build_gui(app_root):
+    """Build the search bar, table and menu inside the main window"""
+    global root, table, search_var, options_menu
+    root = app_root
 
-tk.Label(root, text="Search Student:").pack(pady=5)
-search_entry = tk.Entry(root, textvariable=search_var, width=40)
-search_entry.pack(pady=5)
+    root.title("Student Manager")
+    root.geometry("1100x600")
+
+    apply_theme(root)
+
+    # --- Search bar ---
+    search_var = tk.StringVar()
+    search_var.trace("w", search_student)
+
+    tk.Label(root, text="Search Student:").pack(pady=5)
+    search_entry = tk.Entry(root, textvariable=search_var, width=40)
+    search_entry.pack(pady=5)
+
+    # --- Table ---
+    columns = REPORT_COLUMNS
+
+    table = ttk.Treeview(root, columns=columns, show="headings", height=20)
+    table.pack(fill="both", expand=True)
+
+    # Add gridlines
+    style = ttk.Style()
+    style.configure("Treeview", bordercolor="gray", borderwidth=1, relief="solid")
+
+    for col in columns:
+        table.heading(col, text=col)
+        table.column(col, width=90)
+
+    # --- Menu ---
+    menu = tk.Menu(root)
+    root.config(menu=menu)
+
+    m = options_menu = tk.Menu(menu, tearoff=0)
+    menu.add_cascade(label="Options", menu=m)
+    m.add_command(label="View All", command=view_all)
+    m.add_command(label="View Individual Dashboard", command=view_individual)
+    m.add_separator()
+    m.add_command(label="Add Student", command=add_student)
+    m.add_command(label="Delete Student", command=delete_student)
+    m.add_command(label="Update Student", command=update_student)
+    m.add_separator()
+    m.add_command(label="Export Report...", command=export_report_dialog)
+    m.add_separator()
+    m.add_command(label="Toggle Theme", command=toggle_theme)
+    m.add_separator()
+    m.add_command(label="Exit", command=root.quit)
+
+
+def main():
+    app_root = tk.Tk()
+    install_stall_monitor(app_root)
+    build_gui(app_root)
+    # Treeview rows live in Tcl, which tracemalloc cannot see; the profiler
+    # measures a Python copy of the row values instead.
+    install_memory_profiler(app_root, {
+        "student list": load_students,
+        "treeview rows (copy)": lambda: [table.item(i, "values") for i in table.get_children()],
+    }, menu=options_menu)
+    # Pick up edits made to the file outside the app
+    poll_file(app_root, students_file, reload_students)
+    view_all()
+    root.mainloop()
 
-# --- Table ---
-columns = (
-    "Code", "Name", "C1", "C2", "C3", "Exam",
-    "Coursework", "Total", "%", "Grade", "Attendance"
-)
 
-table = ttk.Treeview(root, columns=columns, show="headings", height=20)
-table.pack(fill="both", expand=True)
-
-# Add gridlines
-style = ttk.Style()
-style.configure("Treeview", bordercolor="gray", borderwidth=1, relief="solid")
-
-for col in columns:
-    table.heading(col, text=col)
-    table.column(col, width=90)
-
-# --- Menu ---
-menu = tk.Menu(root)
-root.config(menu=menu)
-
-m = tk.Menu(menu, tearoff=0)
-menu.add_cascade(label="Options", menu=m)
-m.add_command(label="View All", command=view_all)
-m.add_command(label="View Individual Dashboard", command=view_individual)
-m.add_separator()
-m.add_command(label="Add Student", command=add_student)
-m.add_command(label="Delete Student", command=delete_student)
-m.add_command(label="Update Student", command=update_student)
-m.add_separator()
-m.add_command(label="Toggle Theme", command=toggle_theme)
-m.add_separator()
-m.add_command(label="Exit", command=root.quit)
-
-view_all()
-root.mainloop()
+if __name__ == "__main__":
+    main()
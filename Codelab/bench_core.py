@@ -0,0 +1,251 @@
+"""
+Benchmark and regression check for the Codelab apps' core (non-Tk) logic.
+
+Each case runs one function over synthetic input at growing sizes:
+ - Exercise01: generate_questions, calculate_grade
+ - Exercise02 (its logic lives in jokes.py): parse_joke_line, load_jokes_from_data
+ - Exercise03: grade, overall_percentage, load_students, save_students
+   (its formatting, without the disk sync)
+
+The best time of a few repeats is compared with the baselines saved in
+bench_baselines.json. Noise is kept down in three ways:
+ - fast cases are repeated until they have run for a while
+ - baselines are the best of three passes over every case
+ - a case that looks slower is timed again (twice) before it is reported,
+   so a burst of load from elsewhere on the machine is not a regression
+
+A case still slower than its baseline by more than the tolerance,
+and by at least --min-delta milliseconds, counts as a regression and the
+script exits with status 1.
+
+Baselines depend on the machine, so record them on the machine where you
+compare:
+
+    python Codelab/bench_core.py --update          # record baselines
+    python Codelab/bench_core.py [--tolerance 0.25] [--min-delta 1] [--repeat N] [--only NAME]
+"""
+
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+CODELAB_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(CODELAB_DIR, "bench_baselines.json")
+
+SIZES = (1_000, 10_000, 100_000)
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.25    # 25% slower than the baseline fails...
+DEFAULT_MIN_DELTA = 1.0     # ...if that is also at least this many milliseconds
+MIN_RUN_TIME = 0.2          # keep repeating fast cases for at least this long
+MAX_REPEAT = 200
+RETRIES = 2                 # extra timings of a case before calling it slower
+
+
+def load_apps(data_dir):
+    """Import the three apps' logic with their data files in `data_dir`."""
+    os.environ["CODELAB_DATA_DIR"] = data_dir
+    sys.path.insert(0, CODELAB_DIR)
+    import Exercise01, jokes, Exercise03
+    return Exercise01, jokes, Exercise03
+
+
+# ----------------------- SYNTHETIC DATA -----------------------
+
+def make_joke_lines(n, rng):
+    lines = []
+    for i in range(n):
+        line = f"Why did joke number {i} cross the road?To get to punchline {rng.randint(0, 999)}"
+        if i % 3 == 0:
+            line += f"|Because {i} is a pun on something"
+        lines.append(line)
+    return lines
+
+
+def make_students(n, rng):
+    return [{"code": str(1000 + i), "name": f"Student {i}",
+             "course1": rng.randint(0, 20), "course2": rng.randint(0, 20),
+             "course3": rng.randint(0, 20), "exam": rng.randint(0, 100),
+             "attendance": rng.randint(0, 100)} for i in range(n)]
+
+
+# ----------------------- CASES -----------------------
+# Each case takes (apps, size, rng) and returns the function to time.
+
+def case_generate_questions(apps, n, rng):
+    quiz = SimpleNamespace(difficulty="Hard")
+    return lambda: apps[0].AdditionQuizApp.generate_questions(quiz, n)
+
+
+def case_calculate_grade(apps, n, rng):
+    quizzes = [SimpleNamespace(score=rng.randint(0, 100)) for _ in range(n)]
+    calculate_grade = apps[0].AdditionQuizApp.calculate_grade
+    return lambda: [calculate_grade(q) for q in quizzes]
+
+
+def case_parse_joke_line(apps, n, rng):
+    lines = make_joke_lines(n, rng)
+    parse_joke_line = apps[1].parse_joke_line
+    return lambda: [parse_joke_line(line) for line in lines]
+
+
+def case_load_jokes_from_data(apps, n, rng):
+    data = "\n".join(make_joke_lines(n, rng))
+    return lambda: apps[1].load_jokes_from_data(data)
+
+
+def case_grade(apps, n, rng):
+    students = make_students(n, rng)
+    grade = apps[2].grade
+    return lambda: [grade(s) for s in students]
+
+
+def case_overall_percentage(apps, n, rng):
+    students = make_students(n, rng)
+    overall_percentage = apps[2].overall_percentage
+    return lambda: [overall_percentage(s) for s in students]
+
+
+def case_load_students(apps, n, rng):
+    app = apps[2]
+    app.save_students(make_students(n, rng))
+
+    def run():
+        app.students_file.invalidate()      # time the parse, not the cache
+        return app.load_students()
+    return run
+
+
+def case_save_students(apps, n, rng):
+    # Times the formatting; the fsync in atomic_write depends on the disk,
+    # not on this code, and would drown the signal in noise.
+    students = make_students(n, rng)
+    return lambda: apps[2].write_students(io.StringIO(), students)
+
+
+CASES = {
+    "generate_questions": case_generate_questions,
+    "calculate_grade": case_calculate_grade,
+    "parse_joke_line": case_parse_joke_line,
+    "load_jokes_from_data": case_load_jokes_from_data,
+    "grade": case_grade,
+    "overall_percentage": case_overall_percentage,
+    "load_students": case_load_students,
+    "save_students": case_save_students,
+}
+
+
+# ----------------------- RUNNING -----------------------
+
+def best_time(fn, repeat):
+    """Best of at least `repeat` runs, more for fast cases (up to MAX_REPEAT)."""
+    times = []
+    began = time.perf_counter()
+    while len(times) < repeat or (time.perf_counter() - began < MIN_RUN_TIME
+                                  and len(times) < MAX_REPEAT):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_case(apps, name, size, repeat=DEFAULT_REPEAT, seed=1234):
+    return best_time(CASES[name](apps, size, random.Random(seed)), repeat)
+
+
+def run_benchmarks(apps, names=None, sizes=SIZES, repeat=DEFAULT_REPEAT):
+    """Return {"case[size]": best seconds} for the chosen cases."""
+    results = {}
+    for name in CASES:
+        if names and name not in names:
+            continue
+        for size in sizes:
+            results[f"{name}[{size}]"] = run_case(apps, name, size, repeat)
+    return results
+
+
+def retime(apps, results, keys, repeat=DEFAULT_REPEAT):
+    """Time the cases in `keys` again, keeping the best run.
+
+    A burst of load from elsewhere on the machine can slow a whole case
+    down; a real regression shows up in every run.
+    """
+    for key in keys:
+        name, size = key[:-1].split("[")
+        for _ in range(RETRIES):
+            results[key] = min(results[key], run_case(apps, name, int(size), repeat))
+
+
+def load_baselines(path=BASELINE_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["results"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def save_baselines(results, path=BASELINE_FILE):
+    baselines = load_baselines(path)
+    baselines.update(results)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"python": sys.version.split()[0], "results": baselines}, f, indent=2, sort_keys=True)
+
+
+def compare(results, baselines, tolerance, min_delta=DEFAULT_MIN_DELTA / 1000):
+    """Rows of (key, seconds, baseline or None, ratio or None, regressed)."""
+    rows = []
+    for key, seconds in results.items():
+        base = baselines.get(key)
+        ratio = seconds / base if base else None
+        regressed = ratio is not None and ratio > 1 + tolerance and seconds - base >= min_delta
+        rows.append((key, seconds, base, ratio, regressed))
+    return rows
+
+
+def option_value(argv, flag, default):
+    return argv[argv.index(flag) + 1] if flag in argv else default
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    repeat = int(option_value(argv, "--repeat", DEFAULT_REPEAT))
+    tolerance = float(option_value(argv, "--tolerance", DEFAULT_TOLERANCE))
+    min_delta = float(option_value(argv, "--min-delta", DEFAULT_MIN_DELTA)) / 1000
+    only = option_value(argv, "--only", None)
+    names = only.split(",") if only else None
+
+    baselines = load_baselines()
+    with tempfile.TemporaryDirectory() as data_dir:
+        apps = load_apps(data_dir)
+        results = run_benchmarks(apps, names, repeat=repeat)
+        if "--update" in argv:
+            retime(apps, results, list(results), repeat)   # baselines get the same retries
+            save_baselines(results)
+            print(f"Saved {len(results)} baselines to {BASELINE_FILE}")
+            return 0
+        rows = compare(results, baselines, tolerance, min_delta)
+        suspects = [row[0] for row in rows if row[4]]
+        if suspects:
+            retime(apps, results, suspects, repeat)
+            rows = compare(results, baselines, tolerance, min_delta)
+
+    print(f"{'case':<32}{'time (ms)':>12}{'baseline (ms)':>16}{'ratio':>8}")
+    for key, seconds, base, ratio, regressed in rows:
+        base_s = f"{base * 1000:.2f}" if base else "none"
+        ratio_s = f"{ratio:.2f}" if ratio else "-"
+        print(f"{key:<32}{seconds * 1000:>12.2f}{base_s:>16}{ratio_s:>8}{'  REGRESSED' if regressed else ''}")
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than baseline by more than {tolerance:.0%} "
+              f"and {min_delta * 1000:g} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Start-up benchmark for the Codelab apps.
+
+For each app this measures, in a fresh Python process every time:
+ - import time: how long `import ExerciseNN` takes (should be tiny now that
+   importing builds no window and loads no data)
+ - time to first frame: import + building the GUI + the first Tk update
+   (skipped when no display is available)
+
+Usage (run from the folder holding the data files, as for the apps):
+    python Codelab/bench_startup.py [--repeat N]
+"""
+
+import os
+import subprocess
+import sys
+
+CODELAB_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# How each app builds its window once `root` exists
+BUILDERS = {
+    "Exercise01": "mod.AdditionQuizApp(root)",
+    "Exercise02": "mod.init_jokes([]); mod.build_gui(root)",
+    "Exercise03": "mod.build_gui(root); mod.view_all()",
+}
+
+IMPORT_SNIPPET = """
+import sys, time
+sys.path.insert(0, {codelab!r})
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+FIRST_FRAME_SNIPPET = """
+import sys, time
+sys.path.insert(0, {codelab!r})
+start = time.perf_counter()
+import tkinter as tk
+try:
+    root = tk.Tk()
+except tk.TclError:
+    print("no-display")
+    sys.exit(0)
+import {module} as mod
+{builder}
+root.update_idletasks()
+root.update()
+print(time.perf_counter() - start)
+root.destroy()
+"""
+
+
+def run_snippet(code):
+    """Run code in a fresh interpreter and return its last output line."""
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return out.stdout.strip().splitlines()[-1]
+
+
+def best_of(code, repeat):
+    """Best time over `repeat` fresh processes, or None if the snippet skipped."""
+    times = []
+    for _ in range(repeat):
+        result = run_snippet(code)
+        if result == "no-display":
+            return None
+        times.append(float(result))
+    return min(times)
+
+
+def benchmark(repeat=5):
+    results = {}
+    for module, builder in BUILDERS.items():
+        import_time = best_of(IMPORT_SNIPPET.format(codelab=CODELAB_DIR, module=module), repeat)
+        first_frame = best_of(FIRST_FRAME_SNIPPET.format(codelab=CODELAB_DIR, module=module,
+                                                         builder=builder), repeat)
+        results[module] = {"import": import_time, "first_frame": first_frame}
+    return results
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    repeat = int(argv[argv.index("--repeat") + 1]) if "--repeat" in argv else 5
+
+    print(f"{'app':<12}{'import (ms)':>14}{'first frame (ms)':>20}")
+    for module, r in benchmark(repeat).items():
+        first = f"{r['first_frame'] * 1000:.1f}" if r["first_frame"] is not None else "no display"
+        print(f"{module:<12}{r['import'] * 1000:>14.1f}{first:>20}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Shared data-file access for the Codelab apps.
+
+ - data_path(): where the apps' data files live (the current folder, as
+   before, unless CODELAB_DATA_DIR is set)
+ - CachedFile: parses a file once and hands out the cached result until the
+   file's modification time or size changes
+ - atomic_write(): write to a temp file in the same folder, then rename it
+   over the target, so a crash never leaves a half-written file
+ - poll_file(): checks a CachedFile every so often from the Tk loop and calls
+   back when someone else changed the file
+"""
+
+import os
+import stat
+import tempfile
+import threading
+
+POLL_INTERVAL_MS = 1000
+
+
+def _default_file_mode():
+    """Mode a new file gets from open() under the current umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+NEW_FILE_MODE = _default_file_mode()
+
+
+def data_dir():
+    return os.environ.get("CODELAB_DATA_DIR") or os.getcwd()
+
+
+def data_path(name):
+    return os.path.join(data_dir(), name)
+
+
+def file_signature(path):
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class CachedFile:
+    """A parsed file, re-read only when its mtime or size changes.
+
+    `parse(path)` turns the file into a value; a missing file gives
+    `default()`. Errors named in `errors` (bad data) also give the default
+    instead of crashing the app.
+    """
+
+    def __init__(self, path, parse, default=list, errors=(OSError, ValueError)):
+        self.path = path
+        self.parse = parse
+        self.default = default
+        self.errors = errors
+        self._lock = threading.Lock()
+        self._signature = None
+        self._value = None
+        self._loaded = False
+
+    def get(self):
+        signature = file_signature(self.path)
+        with self._lock:
+            if self._loaded and signature == self._signature:
+                return self._value
+        if signature is None:
+            value = self.default()
+        else:
+            try:
+                value = self.parse(self.path)
+            except self.errors:
+                value = self.default()
+        with self._lock:
+            self._value, self._signature, self._loaded = value, signature, True
+        return value
+
+    def is_stale(self):
+        """True if the file changed since it was last read or written here."""
+        with self._lock:
+            return self._loaded and file_signature(self.path) != self._signature
+
+    def set(self, value):
+        """Record that `value` was just written to the file by this process."""
+        with self._lock:
+            self._value, self._signature, self._loaded = value, file_signature(self.path), True
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+
+
+def atomic_write(path, write, binary=False, encoding="utf-8", newline=None):
+    """Call write(f) on a temp file, then move it over `path` in one step.
+
+    The result keeps the permissions `path` had (or gets the usual ones for
+    a new file), not the private mode mkstemp gives temp files.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=folder)
+    try:
+        mode = "wb" if binary else "w"
+        kwargs = {} if binary else {"encoding": encoding, "newline": newline}
+        with os.fdopen(fd, mode, **kwargs) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = NEW_FILE_MODE
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def poll_file(root, cached, on_change, interval_ms=POLL_INTERVAL_MS):
+    """Every interval, call on_change() if `cached`'s file was changed elsewhere."""
+    def check():
+        if cached.is_stale():
+            on_change()
+        root.after(interval_ms, check)
+
+    root.after(interval_ms, check)
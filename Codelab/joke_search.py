@@ -0,0 +1,183 @@
+"""
+Inverted-index joke search used by the joke app (Exercise02).
+"""
+
+import math
+import heapq
+from array import array
+from bisect import bisect_left
+
+from jokes import cached_for_corpus, tokenize
+
+
+# --- Joke Search (Inverted Index) ---
+# For every word we keep the list of jokes it appears in ("postings") with a
+# weight: words in the setup count most, then the punchline, then the
+# explanation. Each list is also kept in "impact order" (highest weight
+# first), so a query can read the most promising jokes first and stop as
+# soon as no joke it has not read yet could still make the top results.
+FIELD_WEIGHTS = (3.0, 2.0, 1.0)     # setup, punchline, explanation
+MAX_PREFIX_TERMS = 50               # words a prefix like "ch" may expand to
+SEARCH_INDEX_VERSION = 2
+
+
+class JokeSearchIndex:
+    """Inverted index over setup, punchline and explanation of each joke."""
+
+    def __init__(self):
+        self.postings = {}      # word -> (array of joke ids, array of weights)
+        self.impact = {}        # word -> positions in its postings, highest weight first
+        self.vocab = []         # sorted words, for prefix lookups
+        self.new_words = []     # words added since vocab was last sorted
+        self.count = 0
+
+    @classmethod
+    def build(cls, jokes):
+        index = cls()
+        for joke_id in range(len(jokes)):
+            index.add(joke_id, jokes[joke_id])
+        for word in index.postings:
+            index.impact_order(word)
+        return index
+
+    def add(self, joke_id, joke):
+        """Index one joke. Ids must be added in increasing order."""
+        weights = {}
+        for field, weight in zip(joke, FIELD_WEIGHTS):
+            for word in tokenize(field or ""):
+                weights[word] = weights.get(word, 0.0) + weight
+        for word, weight in weights.items():
+            entry = self.postings.get(word)
+            if entry is None:
+                entry = self.postings[word] = (array("I"), array("f"))
+                self.new_words.append(word)
+            entry[0].append(joke_id)
+            entry[1].append(weight)
+            self.impact.pop(word, None)
+        self.count = max(self.count, joke_id + 1)
+
+    def impact_order(self, word):
+        """Positions in the word's postings by weight, highest first (ties by id)."""
+        order = self.impact.get(word)
+        if order is None:
+            weights = self.postings[word][1]
+            order = self.impact[word] = array("I", sorted(range(len(weights)),
+                                                          key=lambda pos: -weights[pos]))
+        return order
+
+    def expand(self, prefix):
+        """Indexed words starting with `prefix` (capped, most common first)."""
+        if self.new_words:
+            self.vocab.extend(self.new_words)
+            self.vocab.sort()
+            self.new_words = []
+        vocab = self.vocab
+        i = bisect_left(vocab, prefix)
+        words = []
+        while i < len(vocab) and vocab[i].startswith(prefix):
+            words.append(vocab[i])
+            i += 1
+        if len(words) > MAX_PREFIX_TERMS:
+            words = heapq.nlargest(MAX_PREFIX_TERMS, words, key=lambda w: len(self.postings[w][0]))
+        return words
+
+    def _matches(self, term):
+        """(best possible score, word, boost) for each indexed word matching `term`."""
+        matches = []
+        for word in self.expand(term):
+            ids, weights = self.postings[word]
+            idf = math.log(1 + self.count / len(ids))
+            # Exact matches rank above words that only share the prefix
+            boost = idf if word == term else idf * 0.5
+            matches.append((weights[self.impact_order(word)[0]] * boost, word, boost))
+        matches.sort(reverse=True)
+        return matches
+
+    def _term_score(self, joke_id, matches):
+        """A joke's score for one query term: its best matching word, or None."""
+        best = None
+        for bound, word, boost in matches:
+            if best is not None and bound <= best:
+                break           # no word after this one can do better
+            ids, weights = self.postings[word]
+            pos = bisect_left(ids, joke_id)
+            if pos < len(ids) and ids[pos] == joke_id:
+                score = weights[pos] * boost
+                if best is None or score > best:
+                    best = score
+        return best
+
+    def _stream(self, matches):
+        """Heap that yields (-score, joke id, ...) for one query term, best first.
+
+        Each matching word's postings are read in impact order and merged,
+        so a joke first comes out with its best score for the term.
+        """
+        heap = []
+        for n, (_, word, boost) in enumerate(matches):
+            ids, weights = self.postings[word]
+            order = self.impact_order(word)
+            heap.append((-weights[order[0]] * boost, ids[order[0]], n, 0, ids, weights, order, boost))
+        heapq.heapify(heap)
+        return heap
+
+    def search(self, query, limit=20):
+        """Ids of the best jokes containing every query word (as a prefix).
+
+        A joke scores, for each query word, the tf-idf weight of its best
+        matching indexed word, and these are added up. Each query word's
+        jokes are read best first, taking turns; a joke is scored in full
+        (by looking it up for the other words) the first time it comes up.
+        Reading stops once the best scores still unread add up to no more
+        than the current last result, or once any word runs out of jokes,
+        which keeps a query with a rare word cheap. Jokes tied with the last
+        result may be left out.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+        matches = [self._matches(t) for t in terms]
+        if not all(matches):
+            return []
+        streams = [self._stream(m) for m in matches]
+
+        top = []        # min-heap of (score, -joke id), the best `limit` so far
+        seen = set()
+        turn = 0
+        while all(streams):
+            if len(top) == limit and -sum(s[0][0] for s in streams) <= top[0][0]:
+                break
+            term = turn % len(streams)
+            turn += 1
+            stream = streams[term]
+            neg_score, joke_id, n, i, ids, weights, order, boost = stream[0]
+            if i + 1 < len(order):
+                pos = order[i + 1]
+                heapq.heapreplace(stream, (-weights[pos] * boost, ids[pos], n, i + 1,
+                                           ids, weights, order, boost))
+            else:
+                heapq.heappop(stream)
+            if joke_id in seen:
+                continue
+            seen.add(joke_id)
+            score = -neg_score
+            for other, term_matches in enumerate(matches):
+                if other == term:
+                    continue
+                term_score = self._term_score(joke_id, term_matches)
+                if term_score is None:
+                    break
+                score += term_score
+            else:
+                item = (score, -joke_id)
+                if len(top) < limit:
+                    heapq.heappush(top, item)
+                elif item > top[0]:
+                    heapq.heapreplace(top, item)
+        return [-neg_id for _, neg_id in sorted(top, reverse=True)]
+
+
+def load_search_index(jokes):
+    """Build the index once; file corpora keep it on disk next to the file."""
+    return cached_for_corpus(jokes, ".search", SEARCH_INDEX_VERSION, JokeSearchIndex.build,
+                             classes=(JokeSearchIndex,))
@@ -0,0 +1,831 @@
+"""
+Joke data and the logic behind the joke app (Exercise02), with no Tk code:
+loading and parsing jokes, the file-backed corpus, the parsed snapshot,
+parallel ingest, the shuffle bag, near-duplicate detection and ratings.
+"""
+
+import random
+import os
+import mmap
+import struct
+import json
+import re
+import pickle
+import marshal
+import hashlib
+import time
+import gc
+from contextlib import contextmanager
+from array import array
+
+from codelab_data import atomic_write, data_path
+
+# --- Data Simulation (Updated Jokes with Explanations) ---
+# This big text block is basically our "database" of jokes.
+# Each line is one joke and contains:
+#  setup ? punchline | explanation
+# We later split these lines into usable pieces.
+# Joke structure: Setup?Punchline|Explanation
+JOKE_DATA_WITH_EXPLANATION = """
+
+What do you call an angry carrot?A steamed veggie.|'Steamed' means cooked with steam, but it also means angry.
+Where do polar bears keep their money?In a snowbank.|A snowbank is a pile of snow, but it sounds like “bank.”
+How do you make an egg roll?You push it!|The joke treats “egg roll” literally as rolling an egg.
+What would bears be without bees?Ears.|Remove the letter B from “bears,” you get “ears.”
+What do you call a pile of cats?A meow-ntain.|It’s a pun combining “meow” with “mountain.”
+Why do cows wear bells?Because their horns don’t work.|Cows have horns, but this refers to car horns.
+Why did the bicycle fall over?Because it was two tired.|“Two tired” sounds like “too tired.”
+What did the triangle say to the circle?You’re pointless.|A circle has no points.
+RIP, boiling water.You will be mist.|“Be mist” sounds like “be missed.”
+Time flies like an arrow.Fruit flies like a banana.|Wordplay: first “flies” is a verb, second is a noun.
+I ordered a chicken and an egg online.I’ll let you know what comes first.|Reference to the classic question.
+Why was Cinderella bad at soccer?She kept running away from the ball.|The ball is both a dance party & a soccer ball.
+What do lawyers wear to court?Lawsuits.|A pun: “lawsuit” sounds like “suit.”
+What do elves learn in school?The elf-abet.|Pun on “alphabet.”
+Where was King David’s temple located?Beside his ear.|“Temple” also means part of the head.
+What did one toilet say to another?You look flushed.|Flushed = toilet function + turning red.
+What lights up a soccer stadium?A soccer match.|“Match” = game or something that lights flame.
+What does corn say when it gets a compliment?Aw, shucks!|“Shucks” means modesty and also corn husk.
+What’s the difference between a poorly dressed man on a tricycle and a well-dressed man on a bicycle?Attire.|“Attire” sounds like “a tire.”
+Why did the chicken cross the road?To get to the other side.|Classic anticlimax joke.
+What happens if you boil a clown?You get a laughing stock.|“Laughingstock” is someone mocked; here it’s literal stock.
+Why did the car get a flat tire?Because there was a fork in the road!|“Fork in the road” means a split path, not an actual fork.
+How did the hipster burn his mouth?He ate his pizza before it was cool.|Hipsters like things before they’re “cool.”
+What did the janitor say when he jumped out of the closet?SUPPLIES!!!!|Sounds like “surprise!”
+Have you heard about the band 1023MB?They haven't got a gig yet…|You need 1024MB for a gigabyte.
+Why does the golfer wear two pants?In case he gets a hole-in-one.|Hole-in-one = golf term & pant hole.
+Why should you wear glasses to maths class?It helps with division.|Division = math & dividing vision.
+Why does it take pirates so long to learn the alphabet?They could spend years at C.|“C” sounds like “sea.”
+Why did the woman go on a date with a mushroom?He was a fun-ghi.|Fun guy.
+Why do bananas never get lonely?They hang out in bunches.|Literal bunches.
+What did the buffalo say when his kid went to college?Bison.|Sounds like “bye, son.”
+Why shouldn't you tell secrets in a cornfield?Too many ears.|Corn has “ears.”
+What do you call someone who doesn't like carbs?Lack-Toast Intolerant.|Sounds like lactose intolerant.
+Why did the can crusher quit his job?It was soda pressing.|“So depressing.”
+Why did the birthday boy wrap himself in paper?He wanted to live in the present.|Present = now & wrapped gift.
+What does a house wear?A dress.|House address = “a dress.”
+Why couldn't the toilet paper cross the road?It got stuck in a crack.|Literal crack in pavement.
+Why didn't the bike want to go anywhere?It was two-tired.|Pun on “too tired.”
+Want to hear a pizza joke?Nahhh, it's too cheesy!|Cheesy = corny humour & cheese in pizza.
+Why are chemists great at solving problems?They have all the solutions.|Solutions = answers & chemical mixtures.
+Why is it impossible to starve in the desert?Because of all the sand which is there!|Sandwich = sand which.
+What did the cheese say when it looked in the mirror?Halloumi!|Sounds like “Hello me.”
+Why did the developer go broke?He used up all his cache.|Cache = money stash & computer cache.
+Did you know ants never get sick?They have little antibodies.|Ant bodies.
+Why did the donut go to the dentist?To get a filling.|Donut filling & dental filling.
+What do you call a bear with no teeth?A gummy bear!|Gummy candy & gum-only bear.
+What does a vegan zombie like to eat?Graaains.|Zombies say “brains.”
+What do you call a dinosaur with only one eye?Do-you-think-he-saw-us!|Sounds like “Do you think he saw us?”
+Why should you never fall in love with a tennis player?Love means nothing.|In tennis, “love” = zero.
+What did the full glass say to the empty glass?You look drunk.|Empty glass looks “tipsy.”
+What's a potato's favorite form of transportation?The gravy train.|Gravy train = easy success + gravy.
+What did one ocean say to the other?Nothing, they just waved.|Wave = sea wave & hand wave.
+What did the right eye say to the left eye?Between you and me, something smells.|The nose is between the eyes.
+What do you call a dog run over by a steamroller?Spot!|It becomes flat → a spot.
+What's the difference between a hippo and a zippo?One's heavy, one’s a little lighter.|Lighter = light & small.
+Why don't scientists trust atoms?They make up everything.|Atoms literally make everything.
+"""
+
+
+
+def parse_joke_line(line):
+    """Parses a single line into (setup, punchline, explanation)"""
+    parts = line.strip().split('?', 1)
+    if len(parts) < 2:
+        return None, None, None
+
+    setup = parts[0].strip() + "?"
+    punchline_explanation_str = parts[1].strip()
+
+    # Separate Punchline and Explanation using the '|' delimiter
+    pe_parts = punchline_explanation_str.split('|', 1)
+    punchline = pe_parts[0].strip()
+    explanation = pe_parts[1].strip() if len(pe_parts) > 1 else "No explanation available."
+    
+    return setup, punchline, explanation
+
+def parse_joke_lines(lines):
+    """Parses lines into jokes; returns (jokes, number of malformed lines)."""
+    jokes = []
+    malformed = 0
+    for line in lines:
+        if line.strip():
+            setup, punchline, explanation = parse_joke_line(line)
+            if setup and punchline:
+                jokes.append((setup, punchline, explanation))
+            else:
+                malformed += 1
+    return jokes, malformed
+
+def load_jokes_from_data(data):
+    """Reads and parses the joke data."""
+    return parse_joke_lines(data.strip().split('\n'))[0]
+
+# --- File-backed Joke Corpus ---
+# The real dataset lives in the resources folder. For big joke files we do not
+# parse everything up front: we remember where each joke line starts (the
+# "offset index"), memory-map the file and only parse the joke that is picked.
+JOKES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                          "Assessment 1 - Skills Portfolio", "A1 - Resources", "randomJokes.txt")
+
+INDEX_MAGIC = b"JKIX"
+INDEX_HEADER = struct.Struct("<4sQQQ4x")   # magic, source size, source mtime_ns, joke count
+OFFSET = struct.Struct("<Q")
+
+
+def is_joke_line(raw):
+    """Byte-level version of the checks load_jokes_from_data does on a line."""
+    parts = raw.split(b"?", 1)
+    return len(parts) == 2 and bool(parts[1].split(b"|", 1)[0].strip())
+
+
+def build_offset_index(mm):
+    """Return the start offset of every valid joke line in the mapped file."""
+    offsets = bytearray()
+    pos = 0
+    while True:
+        line = mm.readline()
+        if not line:
+            break
+        if is_joke_line(line):
+            offsets += OFFSET.pack(pos)
+        pos += len(line)
+    return bytes(offsets)
+
+
+class JokeCorpus:
+    """A joke file used like a read-only list of (setup, punchline, explanation).
+
+    The offset index is saved next to the file as `<file>.idx` and reused
+    while the file's size and modification time are unchanged, so opening a
+    corpus with millions of jokes costs the same as opening a tiny one.
+    """
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self.index_path = index_path or path + ".idx"
+        self._file = open(path, "rb")
+        st = os.fstat(self._file.fileno())
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else b""
+        self._index_file = None
+        self._offsets = self._load_index(st) or self._build_index(st)
+
+    def _load_index(self, st):
+        try:
+            f = open(self.index_path, "rb")
+        except OSError:
+            return None
+        with f:
+            header = f.read(INDEX_HEADER.size)
+            if len(header) < INDEX_HEADER.size:
+                return None
+            magic, size, mtime_ns, count = INDEX_HEADER.unpack(header)
+            if (magic, size, mtime_ns) != (INDEX_MAGIC, st.st_size, st.st_mtime_ns) or count == 0:
+                return None
+            self._index_file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        offsets = memoryview(self._index_file)[INDEX_HEADER.size:].cast("Q")
+        return offsets if len(offsets) == count else None
+
+    def _build_index(self, st):
+        offsets = build_offset_index(self._mm) if st.st_size else b""
+        count = len(offsets) // OFFSET.size
+
+        def write(f):
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, st.st_size, st.st_mtime_ns, count))
+            f.write(offsets)
+
+        try:
+            atomic_write(self.index_path, write, binary=True)
+        except OSError:
+            pass  # read-only location: just keep the index in memory
+        return memoryview(offsets).cast("Q")
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def line(self, i):
+        """Raw text of the i-th joke line."""
+        start = self._offsets[i]
+        end = self._mm.find(b"\n", start)
+        if end == -1:
+            end = len(self._mm)
+        return self._mm[start:end].decode("utf-8", errors="replace")
+
+    def __getitem__(self, i):
+        return parse_joke_line(self.line(i))
+
+
+# --- Parsed Joke Snapshot ---
+# Parsing the joke text is the slow part of start-up, so the parsed list is
+# saved as a binary snapshot together with a hash of the text it came from.
+# Next time, if the text hashes the same, the snapshot is loaded instead.
+JOKE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "joke_cache")
+SNAPSHOT_MAGIC = b"JKSN"
+SNAPSHOT_VERSION = 1
+
+
+def source_hash(data):
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=32).digest()
+
+
+def load_jokes_cached(data, name="built-in", cache_dir=JOKE_CACHE_DIR):
+    """Same result as load_jokes_from_data(data), via the snapshot when it is current."""
+    digest = source_hash(data)
+    path = os.path.join(cache_dir, name + ".snap")
+    header = SNAPSHOT_MAGIC + bytes([SNAPSHOT_VERSION]) + digest
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(header)) == header:
+                return marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    jokes = load_jokes_from_data(data)
+
+    def write(f):
+        f.write(header)
+        marshal.dump(jokes, f)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        atomic_write(path, write, binary=True)
+    except OSError:
+        pass
+    return jokes
+
+
+def measure_cold_start(data, repeat=5):
+    """Best-of-`repeat` seconds to get the parsed jokes with and without the cache."""
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    import tempfile
+    with tempfile.TemporaryDirectory() as cache_dir:
+        name = "bench"
+        path = os.path.join(cache_dir, name + ".snap")
+
+        def rebuild():
+            if os.path.exists(path):
+                os.remove(path)
+            load_jokes_cached(data, name, cache_dir)
+
+        return {
+            "jokes": len(load_jokes_from_data(data)),
+            "no_cache": best(lambda: load_jokes_from_data(data)),
+            "cache_rebuild": best(rebuild),
+            "cache_hit": best(lambda: load_jokes_cached(data, name, cache_dir)),
+        }
+
+
+# --- Parallel Ingest ---
+# Very large joke dumps are cut into chunks that each start and end on a line
+# boundary; the chunks are parsed in separate processes and the results are
+# put back together in file order.
+CHUNKS_PER_WORKER = 4
+
+
+@contextmanager
+def gc_paused():
+    """Millions of new tuples make the cyclic GC rescan memory again and
+    again; none of them can form cycles, so switch it off while parsing."""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def chunk_boundaries(path, chunks):
+    """Split the file into about `chunks` byte ranges that end on a newline."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    step = max(1, size // max(1, chunks))
+    bounds = [0]
+    with open(path, "rb") as f:
+        while bounds[-1] + step < size:
+            f.seek(bounds[-1] + step)
+            f.readline()            # move on to the start of the next line
+            pos = f.tell()
+            if pos >= size:
+                break
+            bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def parse_chunk(path, start, end):
+    """Parse bytes [start, end) of a joke file; runs inside a worker process.
+
+    Returns (joke count, malformed count, setups, punchlines, explanations)
+    with each field column joined by newlines, which no field can contain.
+    Sending three big strings back is much cheaper than pickling tuples.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8", errors="replace")
+    with gc_paused():
+        jokes, malformed = parse_joke_lines(text.split("\n"))
+    return (len(jokes), malformed) + tuple("\n".join(column) for column in zip(*jokes))
+
+
+class JokeColumns:
+    """Jokes kept as three lists (setups, punchlines, explanations).
+
+    This is what parallel ingest returns. Zipping millions of joke fields
+    back into tuples would be slow serial work in the parent process, so a
+    joke's tuple is only made when it is read.
+    """
+
+    def __init__(self):
+        self.setups, self.punchlines, self.explanations = [], [], []
+
+    def extend(self, setups, punchlines, explanations):
+        self.setups.extend(setups)
+        self.punchlines.extend(punchlines)
+        self.explanations.extend(explanations)
+
+    def __len__(self):
+        return len(self.setups)
+
+    def __getitem__(self, i):
+        return self.setups[i], self.punchlines[i], self.explanations[i]
+
+    def __iter__(self):
+        return zip(self.setups, self.punchlines, self.explanations)
+
+
+def unpack_chunk(result):
+    """(setups, punchlines, explanations, malformed count) from parse_chunk's result."""
+    count, malformed = result[:2]
+    if not count:
+        return [], [], [], malformed
+    return tuple(column.split("\n") for column in result[2:]) + (malformed,)
+
+
+def load_jokes_parallel(path, workers=None):
+    """Parse a joke file with a process pool.
+
+    Returns (jokes, report); the jokes (a JokeColumns) are in file order and
+    report has one dict per chunk with its byte range, joke count and
+    malformed line count.
+    """
+    # Imported here: starting the joke app should not pay for multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    bounds = chunk_boundaries(path, workers * CHUNKS_PER_WORKER)
+    jokes, report = JokeColumns(), []
+    if not bounds:
+        return jokes, report
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(parse_chunk, [path] * len(bounds),
+                           [b[0] for b in bounds], [b[1] for b in bounds])
+        for n, ((start, end), result) in enumerate(zip(bounds, results)):
+            setups, punchlines, explanations, malformed = unpack_chunk(result)
+            jokes.extend(setups, punchlines, explanations)
+            report.append({"chunk": n, "start": start, "end": end,
+                           "jokes": len(setups), "malformed": malformed})
+    return jokes, report
+
+
+def option_value(argv, flag, default=None):
+    """Value following `flag` in argv (default if missing or another flag)."""
+    i = argv.index(flag)
+    if i + 1 < len(argv) and not argv[i + 1].startswith("--"):
+        return argv[i + 1]
+    return default
+
+
+def load_jokes(argv):
+    """Pick the joke source from the command line options.
+
+    `--corpus [PATH]` reads jokes lazily from a file, `--ingest PATH
+    [--workers N]` parses a whole file in parallel, otherwise the built-in
+    block is used.
+    """
+    if "--corpus" in argv:
+        return JokeCorpus(option_value(argv, "--corpus", JOKES_FILE))
+    if "--ingest" in argv:
+        workers = int(option_value(argv, "--workers", 0)) if "--workers" in argv else None
+        jokes, report = load_jokes_parallel(option_value(argv, "--ingest", JOKES_FILE), workers)
+        for chunk in report:
+            print(f"chunk {chunk['chunk']}: bytes {chunk['start']}-{chunk['end']}, "
+                  f"{chunk['jokes']} jokes, {chunk['malformed']} malformed lines")
+        return jokes
+    if "--no-cache" in argv:
+        return load_jokes_from_data(JOKE_DATA_WITH_EXPLANATION)
+    return load_jokes_cached(JOKE_DATA_WITH_EXPLANATION)
+
+
+def joke_source(argv):
+    """Label of the jokes picked by `argv`, keying their ratings and session.
+
+    File sources are labelled by path (and how they were read, since ids can
+    differ). Ratings are matched to jokes by content, so editing a source
+    keeps the ratings of the jokes that are still in it.
+    """
+    if "--corpus" in argv:
+        return "corpus:" + os.path.abspath(option_value(argv, "--corpus", JOKES_FILE))
+    if "--ingest" in argv:
+        return "ingest:" + os.path.abspath(option_value(argv, "--ingest", JOKES_FILE))
+    return "built-in"
+
+
+# --- Non-repeating Joke Order ---
+# Instead of random.choice (which repeats quickly) we walk through a random
+# permutation of the joke numbers. The permutation is computed on the fly by a
+# small Feistel network, so nothing is shuffled or copied, whatever the size.
+SESSION_FILE = data_path("joke_session.json")
+FEISTEL_ROUNDS = 6
+
+
+class ShuffleBag:
+    """Hands out every index in range(n) once, in random order, then reshuffles."""
+
+    def __init__(self, n, seed=None, position=0):
+        self.n = n
+        self.position = position
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        self.seed = random.getrandbits(64) if seed is None else seed
+        rng = random.Random(self.seed)
+        self._keys = [rng.getrandbits(32) for _ in range(FEISTEL_ROUNDS)]
+        bits = max(2, (self.n - 1).bit_length())
+        self._half_bits = (bits + 1) // 2
+        self._half_mask = (1 << self._half_bits) - 1
+
+    def _feistel(self, x):
+        left, right = x >> self._half_bits, x & self._half_mask
+        for key in self._keys:
+            # murmur3 finaliser as the round function
+            mixed = right ^ key
+            mixed = ((mixed ^ (mixed >> 16)) * 0x85EBCA6B) & 0xFFFFFFFF
+            mixed = ((mixed ^ (mixed >> 13)) * 0xC2B2AE35) & 0xFFFFFFFF
+            mixed ^= mixed >> 16
+            left, right = right, left ^ (mixed & self._half_mask)
+        return (left << self._half_bits) | right
+
+    def permute(self, i):
+        """Position i of this bag's permutation (cycle-walk back into range)."""
+        x = self._feistel(i)
+        while x >= self.n:
+            x = self._feistel(x)
+        return x
+
+    def next(self):
+        if self.position >= self.n:
+            self.reseed()
+            self.position = 0
+        i = self.permute(self.position)
+        self.position += 1
+        return i
+
+    def state(self):
+        return {"n": self.n, "seed": self.seed, "position": self.position}
+
+
+def load_sessions(path=SESSION_FILE):
+    """joke source -> saved bag state, for every source used so far."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            sessions = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return sessions if isinstance(sessions, dict) else {}
+
+
+def resume_joke_bag(n, saved):
+    """Continue the bag a saved state() describes, or start a fresh one."""
+    try:
+        if saved.get("n") == n:
+            return ShuffleBag(n, saved["seed"], saved["position"])
+    except (KeyError, TypeError, AttributeError):
+        pass
+    return ShuffleBag(n)
+
+
+def save_sessions(sessions, path=SESSION_FILE):
+    try:
+        atomic_write(path, lambda f: json.dump(sessions, f))
+    except OSError:
+        pass  # losing the session only means jokes may repeat after a restart
+
+
+# --- Words ---
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return WORD_RE.findall(text.lower())
+
+
+# --- Corpus Caches ---
+# Results that are slow to work out for a big corpus file (search index,
+# duplicate ids) are pickled next to it and reused while the file is unchanged.
+class CacheUnpickler(pickle.Unpickler):
+    """Unpickler for the corpus caches that only rebuilds the types they hold.
+
+    The caches sit next to the corpus file, so whoever can write the corpus
+    can write them too; still, a planted file must not be able to run code,
+    so any other class or function is refused. `classes` are the caller's
+    own types that the cache may also hold.
+    """
+
+    ALLOWED = {("array", "_array_reconstructor"), ("array", "array"),
+               ("builtins", "set"), ("builtins", "frozenset")}
+
+    def __init__(self, file, classes=()):
+        super().__init__(file)
+        self.classes = {(cls.__module__, cls.__qualname__): cls for cls in classes}
+
+    def find_class(self, module, name):
+        if (module, name) in self.ALLOWED:
+            return super().find_class(module, name)
+        if (module, name) in self.classes:
+            return self.classes[(module, name)]
+        raise pickle.UnpicklingError(f"{module}.{name} is not allowed in a cache file")
+
+
+def cached_for_corpus(jokes, suffix, version, build, classes=()):
+    """Run build(jokes) once per corpus file, keeping the result next to it.
+
+    The saved result is reused while the file's size and modification time
+    (and the `version` of whatever is being built) stay the same. Jokes that
+    are not file-backed are cheap enough to just build every time. A cache
+    file that cannot be read (or holds anything unexpected) is rebuilt;
+    `classes` lists the types, besides arrays and sets, the result is made of.
+    """
+    if not isinstance(jokes, JokeCorpus):
+        return build(jokes)
+
+    st = os.stat(jokes.path)
+    key = (version, st.st_size, st.st_mtime_ns, len(jokes))
+    cache_path = jokes.path + suffix
+    try:
+        with open(cache_path, "rb") as f:
+            saved_key, result = CacheUnpickler(f, classes).load()
+        if saved_key == key:
+            return result
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError,
+            AttributeError, IndexError, KeyError):
+        pass
+    result = build(jokes)
+    try:
+        atomic_write(cache_path, lambda f: pickle.dump((key, result), f, protocol=pickle.HIGHEST_PROTOCOL),
+                     binary=True)
+    except OSError:
+        pass
+    return result
+
+
+# --- Near-duplicate Jokes ---
+# The same joke often turns up reworded ("two tired" / "two-tired"). Comparing
+# every pair of jokes is far too slow for big files, so we use MinHash + LSH:
+# each joke gets a short signature, jokes whose signatures agree on a whole
+# band land in the same bucket, and only those candidate pairs are checked.
+# Jokes are compared on their punchline, which is the part that repeats.
+MINHASH_SIZE = 64                   # hash values per signature
+LSH_BANDS = 16                      # 16 bands of 4 values each
+DUPLICATE_THRESHOLD = 0.6           # word overlap (Jaccard) to call it a duplicate
+DEDUP_VERSION = 2
+MINHASH_ROW = struct.Struct("<16I")
+_MINHASH_SALTS = [bytes([n]) * 16 for n in range(MINHASH_SIZE // 16)]
+
+
+def joke_shingles(joke):
+    """Words and word pairs of the punchline (setup if it has none)."""
+    words = tokenize(joke[1]) or tokenize(joke[0])
+    return set(words + [a + " " + b for a, b in zip(words, words[1:])])
+
+
+def shingle_hashes(shingle):
+    """MINHASH_SIZE independent 32-bit hashes of one shingle."""
+    raw = shingle.encode("utf-8")
+    values = ()
+    for salt in _MINHASH_SALTS:
+        values += MINHASH_ROW.unpack(hashlib.blake2b(raw, digest_size=64, salt=salt).digest())
+    return values
+
+
+def minhash_signature(shingles):
+    if not shingles:
+        return None
+    return tuple(map(min, zip(*map(shingle_hashes, shingles))))
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def find_duplicate_clusters(jokes, threshold=DUPLICATE_THRESHOLD):
+    """Groups of near-duplicate joke ids (each sorted, only groups of 2+)."""
+    n = len(jokes)
+    rows = MINHASH_SIZE // LSH_BANDS
+    # Each band of a signature is hashed to one 32-bit key straight away and
+    # the signature is dropped, so memory stays at LSH_BANDS * 4 bytes a joke.
+    band_keys = [array("I") for _ in range(LSH_BANDS)]
+    no_words = set()
+    for joke_id in range(n):
+        sig = minhash_signature(joke_shingles(jokes[joke_id]))
+        if sig is None:
+            no_words.add(joke_id)
+            sig = (0,) * MINHASH_SIZE
+        for band, keys in enumerate(band_keys):
+            keys.append(hash(sig[band * rows:(band + 1) * rows]) & 0xFFFFFFFF)
+
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a, b):
+        # LSH only proposes the pair; the real word overlap decides
+        if jaccard(joke_shingles(jokes[a]), joke_shingles(jokes[b])) >= threshold:
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    # Sorting a band's keys puts each bucket's jokes next to each other (in
+    # id order). Within a bucket, check each joke against the first one and
+    # its neighbour only: linear per bucket, and groups still join up
+    # through the other bands.
+    for keys in band_keys:
+        first = prev = None
+        for joke_id in sorted(range(n), key=keys.__getitem__):
+            if joke_id in no_words:
+                continue
+            if first is None or keys[joke_id] != keys[first]:
+                first = prev = joke_id
+                continue
+            union(first, joke_id)
+            if prev != first:
+                union(prev, joke_id)
+            prev = joke_id
+
+    clusters = {}
+    for joke_id in range(n):
+        clusters.setdefault(find(joke_id), []).append(joke_id)
+    return sorted(c for c in clusters.values() if len(c) > 1)
+
+
+def duplicate_ids(jokes):
+    """Ids to skip: every member of a duplicate group except the first."""
+    return frozenset(j for cluster in find_duplicate_clusters(jokes) for j in cluster[1:])
+
+
+# --- Joke Ratings & Weighted Selection ---
+# Thumbs up/down per joke, saved as small fixed-size records. A joke's weight
+# is (ups + 1) / (downs + 1), so unrated jokes have weight 1. Drawing uses
+# Vose's alias method (O(1) per draw) over the rated jokes only; unrated jokes
+# all weigh the same, so they are drawn uniformly without any table.
+RATINGS_FILE = "joke_ratings-{}.bin"                # one file per joke source
+RATINGS_MAGIC = b"JKRT"
+RATINGS_HEADER = struct.Struct("<4sBxxxQ16s")     # magic, version, joke count, source hash
+RATING_RECORD = struct.Struct("<I8sHH")            # joke id, joke hash, ups, downs
+RATING_RECORD_V1 = struct.Struct("<IHH")           # joke id, ups, downs
+RATINGS_VERSION = 2
+RATING_LIMIT = 0xFFFF
+
+
+def ratings_key(source):
+    return hashlib.blake2b(source.encode("utf-8"), digest_size=16).digest()
+
+
+def ratings_path(source):
+    """Each joke source keeps its ratings in its own file."""
+    return data_path(RATINGS_FILE.format(ratings_key(source).hex()[:16]))
+
+
+def joke_key(joke):
+    """Short hash of a joke's setup and punchline, to find its rating again."""
+    return hashlib.blake2b(f"{joke[0]}\n{joke[1]}".encode("utf-8"), digest_size=8).digest()
+
+
+def load_ratings(jokes, source, path=None):
+    """joke id -> [ups, downs] for this joke source (empty if none saved).
+
+    Each rating is saved with its joke's id and a hash of the joke. Usually
+    the joke is still at that id; if jokes were added or removed before it,
+    one pass over the jokes finds it again by hash. Ratings of jokes that
+    are gone are dropped.
+    """
+    path = path or ratings_path(source)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, count, key = RATINGS_HEADER.unpack_from(data)
+        if (magic, key) != (RATINGS_MAGIC, ratings_key(source)):
+            return {}
+        body = memoryview(data)[RATINGS_HEADER.size:]
+        if version == 1:
+            # Ids only: they still fit the jokes if the count is unchanged
+            if count != len(jokes):
+                return {}
+            return {joke_id: [ups, downs] for joke_id, ups, downs in RATING_RECORD_V1.iter_unpack(body)
+                    if joke_id < count}
+        if version != RATINGS_VERSION:
+            return {}
+        records = list(RATING_RECORD.iter_unpack(body))
+    except (OSError, struct.error):
+        return {}
+
+    ratings, moved = {}, {}
+    for joke_id, key, ups, downs in records:
+        if joke_id < len(jokes) and joke_key(jokes[joke_id]) == key:
+            ratings[joke_id] = [ups, downs]
+        else:
+            moved[key] = [ups, downs]
+    if moved:
+        for joke_id in range(len(jokes)):
+            key = joke_key(jokes[joke_id])
+            if key in moved and joke_id not in ratings:
+                ratings[joke_id] = moved.pop(key)
+                if not moved:
+                    break
+    return ratings
+
+
+def save_ratings(ratings, jokes, source, path=None):
+    path = path or ratings_path(source)
+
+    def write(f):
+        f.write(RATINGS_HEADER.pack(RATINGS_MAGIC, RATINGS_VERSION, len(jokes), ratings_key(source)))
+        f.write(b"".join(RATING_RECORD.pack(j, joke_key(jokes[j]), ups, downs)
+                         for j, (ups, downs) in sorted(ratings.items())))
+
+    try:
+        atomic_write(path, write, binary=True)
+    except OSError:
+        pass
+
+
+def rating_weight(ups, downs):
+    return (ups + 1) / (downs + 1)
+
+
+def build_alias_table(weights):
+    """Vose's alias method: returns (prob, alias) lists for O(1) draws."""
+    n = len(weights)
+    total = sum(weights)
+    scaled = [w * n / total for w in weights]
+    prob, alias = [1.0] * n, list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s], alias[s] = scaled[s], l
+        scaled[l] -= 1.0 - scaled[s]
+        (small if scaled[l] < 1.0 else large).append(l)
+    return prob, alias
+
+
+class WeightedJokeSampler:
+    """Draws joke ids in proportion to their rating weight.
+
+    Only rated jokes are in the alias table, and it is rebuilt lazily on the
+    next draw after a rating changes, so the cost follows the number of rated
+    jokes, not the corpus size. `excluded` ids (duplicates) are never drawn.
+    """
+
+    def __init__(self, n, ratings, excluded=frozenset(), rng=random):
+        self.n = n
+        self.excluded = excluded
+        self.rng = rng
+        self.weights = {j: rating_weight(*r) for j, r in ratings.items() if j not in excluded}
+        self._table = None
+
+    def set_rating(self, joke_id, ups, downs):
+        if joke_id not in self.excluded:
+            self.weights[joke_id] = rating_weight(ups, downs)
+            self._table = None
+
+    def _build(self):
+        ids = list(self.weights)
+        prob, alias = build_alias_table([self.weights[j] for j in ids]) if ids else ([], [])
+        self._table = (ids, prob, alias, sum(self.weights.values()))
+
+    def draw(self):
+        if self._table is None:
+            self._build()
+        ids, prob, alias, rated_total = self._table
+        unrated = self.n - len(self.excluded) - len(ids)
+        if ids and self.rng.random() * (unrated + rated_total) >= unrated:
+            k = self.rng.randrange(len(ids))
+            return ids[k] if self.rng.random() < prob[k] else ids[alias[k]]
+        # Uniform over unrated jokes: retry the (few) rated or excluded hits
+        while True:
+            joke_id = self.rng.randrange(self.n)
+            if joke_id not in self.weights and joke_id not in self.excluded:
+                return joke_id
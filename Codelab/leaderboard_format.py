@@ -0,0 +1,277 @@
+"""
+Compact binary leaderboard file used by the Maths Quiz (Exercise01).
+
+Layout (all little-endian):
+
+    header   32 bytes   magic, version, record size, record count,
+                        offset and size of the name table
+    records  16 bytes   name id (u32), score (u16), grade code (u8), pad,
+                        finish time as epoch seconds (i64)
+    names    variable   each name once: length (u16) + UTF-8 bytes
+
+Records are kept sorted best score first (ties in the order they were
+saved), so the top of the leaderboard is simply the first few records and
+opening a file with millions of entries only has to read the header.
+"""
+
+import json
+import mmap
+import os
+import struct
+from bisect import bisect_right
+from datetime import datetime
+
+from codelab_data import atomic_write
+
+MAGIC = b"QZLB"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHHQQI4x")
+RECORD = struct.Struct("<IHBxq")
+NAME_LEN = struct.Struct("<H")
+MAX_NAME_BYTES = 0xFFFF     # names are stored with a u16 length
+MAX_SCORE = 0xFFFF
+
+# Grade code 0 means "unknown" (old entries that were saved without one)
+GRADES = ("", "A+", "A", "B", "C", "D")
+GRADE_CODES = {g: i for i, g in enumerate(GRADES)}
+
+
+class LeaderboardFormatError(ValueError):
+    """The file is not a leaderboard file this version can read."""
+
+
+class InvalidEntryError(ValueError):
+    """An entry that the format cannot store (name too long, bad score...)."""
+
+
+def check_entry(entry):
+    """Raise InvalidEntryError unless `entry` can be written."""
+    try:
+        name, score = entry["name"], int(entry["score"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidEntryError(f"missing or bad name/score ({e})") from e
+    try:
+        raw = name.encode("utf-8")
+    except (AttributeError, UnicodeEncodeError) as e:
+        raise InvalidEntryError("name is not valid text") from e
+    if len(raw) > MAX_NAME_BYTES:
+        raise InvalidEntryError(f"name is longer than {MAX_NAME_BYTES} bytes")
+    if not 0 <= score <= MAX_SCORE:
+        raise InvalidEntryError(f"score {score} is outside 0-{MAX_SCORE}")
+    date = entry.get("date")
+    if date:
+        try:
+            datetime.fromisoformat(date).timestamp()
+        except (TypeError, ValueError, OverflowError, OSError) as e:
+            raise InvalidEntryError(f"bad date {date!r}") from e
+
+
+def _encode_entry(entry, name_ids, names):
+    """Turn an entry dict into a packed record, interning the name."""
+    name = entry["name"]
+    if name not in name_ids:
+        name_ids[name] = len(names)
+        names.append(name)
+    date = entry.get("date")
+    stamp = int(datetime.fromisoformat(date).timestamp()) if date else 0
+    return RECORD.pack(name_ids[name], int(entry["score"]),
+                       GRADE_CODES.get(entry.get("grade") or "", 0), stamp)
+
+
+def _encode_names(names):
+    out = bytearray()
+    for name in names:
+        raw = name.encode("utf-8")
+        out += NAME_LEN.pack(len(raw)) + raw
+    return bytes(out)
+
+
+class LeaderboardFile:
+    """Read-only, memory-mapped view of a leaderboard file.
+
+    Works like a sequence of entry dicts (best score first). Records are
+    only decoded when they are accessed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._names = None
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise LeaderboardFormatError(f"{path}: file too short")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rec_size, count, names_off, names_count = HEADER.unpack_from(self._mm)
+        if magic != MAGIC or rec_size != RECORD.size:
+            self._mm.close()
+            raise LeaderboardFormatError(f"{path}: not a leaderboard file")
+        if version > VERSION:
+            self._mm.close()
+            raise LeaderboardFormatError(f"{path}: format version {version} is newer than {VERSION}")
+        if not HEADER.size + count * RECORD.size <= names_off <= size:
+            self._mm.close()
+            raise LeaderboardFormatError(f"{path}: truncated or bad record count")
+        self.count = count
+        self._names_off = names_off
+        self._names_count = names_count
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def names(self):
+        """The interned name table (decoded on first use)."""
+        if self._names is None:
+            names, pos = [], self._names_off
+            try:
+                for _ in range(self._names_count):
+                    (n,) = NAME_LEN.unpack_from(self._mm, pos)
+                    pos += NAME_LEN.size
+                    if pos + n > len(self._mm):
+                        raise LeaderboardFormatError(f"{self.path}: name table is truncated")
+                    names.append(self._mm[pos:pos + n].decode("utf-8"))
+                    pos += n
+            except (struct.error, UnicodeDecodeError) as e:
+                raise LeaderboardFormatError(f"{self.path}: bad name table ({e})") from e
+            self._names = names
+        return self._names
+
+    def raw(self, i):
+        """Return the raw (name_id, score, grade_code, epoch) tuple of record i."""
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return RECORD.unpack_from(self._mm, HEADER.size + i * RECORD.size)
+
+    def score(self, i):
+        return self.raw(i)[1]
+
+    def _to_entry(self, rec):
+        name_id, score, grade_code, stamp = rec
+        names = self.names
+        try:
+            return {
+                "name": names[name_id],
+                "score": score,
+                "grade": GRADES[grade_code] if grade_code < len(GRADES) else "",
+                "date": datetime.fromtimestamp(stamp).isoformat(),
+            }
+        except (IndexError, OverflowError, OSError, ValueError) as e:
+            raise LeaderboardFormatError(f"{self.path}: bad record ({e})") from e
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.count))]
+        if i < 0:
+            i += self.count
+        return self._to_entry(self.raw(i))
+
+    def top(self, n):
+        return self[:n]
+
+    def insert_position(self, score):
+        """Index a new record with this score goes to (after equal scores)."""
+        # Records are sorted by descending score; bisect on the negated key.
+        keys = _NegatedScores(self)
+        return bisect_right(keys, -score)
+
+
+class _NegatedScores:
+    """Lazy sequence of -score for bisect (no list is ever built)."""
+
+    def __init__(self, lbf):
+        self.lbf = lbf
+
+    def __len__(self):
+        return len(self.lbf)
+
+    def __getitem__(self, i):
+        return -self.lbf.score(i)
+
+
+def write_leaderboard(path, entries):
+    """Write entry dicts to a new leaderboard file atomically."""
+    entries = sorted(entries, key=lambda e: e["score"], reverse=True)
+    name_ids, names = {}, []
+    records = b"".join(_encode_entry(e, name_ids, names) for e in entries)
+    name_table = _encode_names(names)
+
+    def write(f):
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, len(entries),
+                            HEADER.size + len(records), len(names)))
+        f.write(records)
+        f.write(name_table)
+
+    atomic_write(path, write, binary=True)
+
+
+def _copy_bytes(src, dst, size, chunk=1 << 20):
+    while size > 0:
+        data = src.read(min(chunk, size))
+        if not data:
+            raise LeaderboardFormatError(f"{src.name}: file is truncated")
+        dst.write(data)
+        size -= len(data)
+
+
+def append_entries(path, new_entries):
+    """Merge new entries into an existing file (created if missing).
+
+    Existing records are copied across in bulk; only the new records are
+    encoded and placed by binary search.
+    """
+    if not os.path.exists(path):
+        write_leaderboard(path, new_entries)
+        return
+
+    with LeaderboardFile(path) as old:
+        names = list(old.names)
+        name_ids = {n: i for i, n in enumerate(names)}
+        placed = sorted(
+            ((old.insert_position(e["score"]), -e["score"], k, _encode_entry(e, name_ids, names))
+             for k, e in enumerate(new_entries)),
+        )
+        old_count = old.count
+    count = old_count + len(placed)
+    names_off = HEADER.size + count * RECORD.size
+
+    # The old records are copied with plain reads, and the memory map is
+    # already closed: Windows cannot replace a file that is mapped or open.
+    def write(f):
+        with open(path, "rb") as src:
+            src.seek(HEADER.size)
+            f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, count, names_off, len(names)))
+            prev = 0
+            for pos, _neg, _k, rec in placed:
+                _copy_bytes(src, f, (pos - prev) * RECORD.size)
+                f.write(rec)
+                prev = pos
+            _copy_bytes(src, f, (old_count - prev) * RECORD.size)
+        f.write(_encode_names(names))
+
+    atomic_write(path, write, binary=True)
+
+
+def migrate_json(json_path, bin_path, grade_fn=None):
+    """Convert an old ``leaderboard.json`` into the binary format.
+
+    Entries saved without a grade get one from ``grade_fn(score)`` when given.
+    Returns the number of entries migrated.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    if grade_fn is not None:
+        for e in entries:
+            if not e.get("grade"):
+                e["grade"] = grade_fn(e["score"])
+    write_leaderboard(bin_path, entries)
+    return len(entries)
@@ -0,0 +1,199 @@
+"""
+On-demand memory profiling for the Codelab apps, built on tracemalloc.
+
+Each app registers its own data structures by name (the leaderboard cache,
+the joke list and indexes, the student list, the Treeview rows, ...). Every
+snapshot records:
+ - the deep size of each registered structure
+ - tracemalloc's allocation statistics, grouped by source line
+
+and each snapshot is compared with the previous one, so growth between two
+moments (e.g. before and after loading a big file) is easy to spot. All
+snapshots can be exported as JSON.
+
+Opt-in: set CODELAB_MEMORY_PROFILE=1 before starting an app, then press
+Ctrl+Shift+M (or use the menu item, where the app has a menu) to take a
+snapshot. Results go to CODELAB_MEMORY_REPORT (default mem_profile.json).
+
+`measure_peak()` / `assert_peak_below()` can be used from tests to catch
+memory regressions without any GUI.
+"""
+
+import json
+import os
+import sys
+import tracemalloc
+from array import array
+from datetime import datetime
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+
+CODELAB_DIR = os.path.dirname(os.path.abspath(__file__))
+
+TRACE_FRAMES = 5
+TOP_LINES = 15
+DEFAULT_REPORT = "mem_profile.json"
+
+# Shared by the whole program, not owned by any one structure: never followed
+SHARED_TYPES = (ModuleType, type, FunctionType, BuiltinFunctionType, MethodType)
+
+
+def deep_sizeof(obj, seen=None):
+    """Approximate bytes used by obj and everything it references."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(obj, SHARED_TYPES):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, array, memoryview)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(x, seen) for x in obj)
+    else:
+        if hasattr(obj, "__dict__"):
+            size += deep_sizeof(vars(obj), seen)
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+class MemoryProfiler:
+    """Takes labelled snapshots of registered structures and tracemalloc."""
+
+    def __init__(self, frames=TRACE_FRAMES):
+        self.frames = frames
+        self.structures = {}        # name -> function returning the object
+        self.snapshots = []         # (label, tracemalloc snapshot, structure sizes, (current, peak))
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        return self
+
+    def register(self, name, getter):
+        self.structures[name] = getter
+
+    def structure_sizes(self):
+        sizes = {}
+        for name, getter in self.structures.items():
+            try:
+                obj = getter()
+            except Exception as e:
+                sizes[name] = {"error": str(e)}
+                continue
+            sizes[name] = {
+                "bytes": deep_sizeof(obj),
+                "items": len(obj) if hasattr(obj, "__len__") else None,
+            }
+        return sizes
+
+    def snapshot(self, label=None):
+        """Take a snapshot; returns its summary (with the diff to the last one)."""
+        label = label or datetime.now().isoformat(timespec="seconds")
+        sizes = self.structure_sizes()
+        snap = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        previous = self.snapshots[-1] if self.snapshots else None
+        self.snapshots.append((label, snap, sizes, tracemalloc.get_traced_memory()))
+        return self.summary(len(self.snapshots) - 1, previous)
+
+    def summary(self, i, previous=None):
+        label, snap, sizes, (current, peak) = self.snapshots[i]
+        result = {
+            "label": label,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "structures": sizes,
+            "top_lines": [self._stat(s) for s in snap.statistics("lineno")[:TOP_LINES]],
+        }
+        if previous is not None:
+            prev_label, prev_snap, prev_sizes, _ = previous
+            result["compared_to"] = prev_label
+            result["structure_growth"] = {
+                name: sizes[name].get("bytes", 0) - prev_sizes.get(name, {}).get("bytes", 0)
+                for name in sizes
+            }
+            diff = snap.compare_to(prev_snap, "lineno")
+            result["top_growth"] = [self._stat(s, diff=True) for s in diff[:TOP_LINES]]
+            result["app_growth"] = [self._stat(s, diff=True) for s in diff
+                                    if self._is_app_file(s.traceback[0].filename)][:TOP_LINES]
+        return result
+
+    @staticmethod
+    def _is_app_file(filename):
+        return os.path.dirname(os.path.abspath(filename)) == CODELAB_DIR
+
+    @staticmethod
+    def _stat(stat, diff=False):
+        frame = stat.traceback[0]
+        entry = {"where": f"{os.path.basename(frame.filename)}:{frame.lineno}",
+                 "bytes": stat.size, "count": stat.count}
+        if diff:
+            entry["bytes_diff"] = stat.size_diff
+            entry["count_diff"] = stat.count_diff
+        return entry
+
+    def export(self, path=DEFAULT_REPORT):
+        report = [self.summary(i, self.snapshots[i - 1] if i else None)
+                  for i in range(len(self.snapshots))]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"app": os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "?",
+                       "snapshots": report}, f, indent=2)
+        return path
+
+
+def measure_peak(fn, *args, **kwargs):
+    """Run fn and return (result, peak bytes it allocated)."""
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    try:
+        result = fn(*args, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return result, peak
+
+
+def assert_peak_below(limit, fn, *args, **kwargs):
+    """Fail (AssertionError) if fn allocates more than `limit` bytes at its peak."""
+    result, peak = measure_peak(fn, *args, **kwargs)
+    assert peak <= limit, f"{getattr(fn, '__name__', fn)} peaked at {peak} bytes (limit {limit})"
+    return result
+
+
+def install_from_env(root, structures, menu=None):
+    """Turn on profiling for an app if CODELAB_MEMORY_PROFILE is set.
+
+    `structures` maps a name to a function returning the object to measure.
+    Binds Ctrl+Shift+M (and adds a menu item to `menu`, if given) to take a
+    snapshot and export all snapshots. Returns the profiler or None.
+    """
+    if os.environ.get("CODELAB_MEMORY_PROFILE", "") in ("", "0"):
+        return None
+    profiler = MemoryProfiler().start()
+    for name, getter in structures.items():
+        profiler.register(name, getter)
+    report_path = os.environ.get("CODELAB_MEMORY_REPORT", DEFAULT_REPORT)
+
+    def take_snapshot(_evt=None):
+        summary = profiler.snapshot()
+        path = profiler.export(report_path)
+        print(f"Memory snapshot '{summary['label']}': {summary['traced_bytes']} bytes traced, "
+              f"written to {path}")
+        for name, info in summary["structures"].items():
+            print(f"  {name}: {info.get('bytes', info.get('error'))} bytes")
+
+    root.bind_all("<Control-M>", take_snapshot)
+    if menu is not None:
+        menu.add_separator()
+        menu.add_command(label="Memory Snapshot (Ctrl+Shift+M)", command=take_snapshot)
+    return profiler
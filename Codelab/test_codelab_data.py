@@ -0,0 +1,81 @@
+"""Tests for the shared data-file helpers."""
+
+import os
+import stat
+import sys
+
+import pytest
+
+from codelab_data import NEW_FILE_MODE, CachedFile, atomic_write
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX permissions")
+def test_atomic_write_keeps_the_existing_mode(tmp_path):
+    path = tmp_path / "marks.txt"
+    path.write_text("old")
+    os.chmod(path, 0o644)
+
+    atomic_write(str(path), lambda f: f.write("new"))
+
+    assert path.read_text() == "new"
+    assert mode(path) == 0o644
+    assert os.listdir(tmp_path) == ["marks.txt"]      # no temp file left behind
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX permissions")
+def test_atomic_write_new_file_gets_the_umask_mode(tmp_path):
+    path = tmp_path / "new.bin"
+    atomic_write(str(path), lambda f: f.write(b"\x00"), binary=True)
+    assert mode(path) == NEW_FILE_MODE
+
+
+def test_failed_write_leaves_the_old_file(tmp_path):
+    path = tmp_path / "marks.txt"
+    path.write_text("old")
+
+    def write(f):
+        f.write("half")
+        raise RuntimeError("crash")
+
+    with pytest.raises(RuntimeError):
+        atomic_write(str(path), write)
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["marks.txt"]
+
+
+def test_cached_file_rereads_only_after_a_change(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("a")
+    reads = []
+
+    def parse(p):
+        reads.append(p)
+        with open(p) as f:
+            return f.read()
+
+    cached = CachedFile(str(path), parse)
+    assert cached.get() == "a"
+    assert cached.get() == "a"
+    assert len(reads) == 1
+
+    path.write_text("bbb")              # size changes, so the signature does too
+    assert cached.is_stale()
+    assert cached.get() == "bbb"
+    assert len(reads) == 2
+
+    cached.set("ignored")
+    assert not cached.is_stale()
+
+
+def test_cached_file_missing_or_bad_gives_default(tmp_path):
+    path = tmp_path / "missing.txt"
+    assert CachedFile(str(path), lambda p: 1 / 0).get() == []
+
+    path.write_text("x")
+    with pytest.raises(ZeroDivisionError):
+        CachedFile(str(path), lambda p: 1 / 0, errors=()).get()
+    assert CachedFile(str(path), lambda p: int("x")).get() == []
@@ -0,0 +1,189 @@
+"""Tests for the student manager's report export and ranks (Exercise03)."""
+
+import csv
+import json
+import random
+
+import pytest
+
+from Exercise03 import REPORT_COLUMNS, ScoreRanks, export_report, grade, write_students
+
+STUDENTS = [
+    # overall 150/160 = 93.75% -> A
+    {"code": "1001", "name": "Ann Lee", "course1": 20, "course2": 20, "course3": 20, "exam": 90, "attendance": 95},
+    # 85/160 = 53.13% -> C
+    {"code": "1002", "name": "<b>Tom & Jerry</b>", "course1": 10, "course2": 10, "course3": 10, "exam": 55,
+     "attendance": 60},
+    # 150/160 -> A
+    {"code": "1003", "name": "Zoë \"Z\" O'Neil", "course1": 20, "course2": 20, "course3": 20, "exam": 90,
+     "attendance": 100},
+    # 20/160 = 12.5% -> F
+    {"code": "1004", "name": "Bo", "course1": 5, "course2": 5, "course3": 5, "exam": 5, "attendance": 10},
+]
+
+
+def roster(tmp_path, students=STUDENTS):
+    path = tmp_path / "studentMarks.txt"
+    with open(path, "w") as f:
+        write_students(f, students)
+    return str(path)
+
+
+def test_csv_report(tmp_path):
+    out = tmp_path / "report.csv"
+    assert export_report(str(out), source=roster(tmp_path)) == {str(out): 4}
+
+    with open(out, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(REPORT_COLUMNS)
+    assert rows[1] == ["1001", "Ann Lee", "20", "20", "20", "90", "60", "150", "93.75", "A", "95%"]
+    assert [r[1] for r in rows[1:]] == [s["name"] for s in STUDENTS]
+    assert [r[9] for r in rows[1:]] == ["A", "C", "A", "F"]
+
+
+def test_jsonl_report(tmp_path):
+    out = tmp_path / "report.jsonl"
+    export_report(str(out), source=roster(tmp_path))
+
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert len(records) == 4
+    assert list(records[1]) == list(REPORT_COLUMNS)
+    assert records[1]["Name"] == "<b>Tom & Jerry</b>"
+    assert records[1]["Total"] == 85 and records[1]["%"] == "53.12" and records[1]["Grade"] == "C"
+
+
+def test_html_report_escapes_names(tmp_path):
+    out = tmp_path / "report.html"
+    export_report(str(out), source=roster(tmp_path))
+    text = out.read_text(encoding="utf-8")
+
+    assert "<td>&lt;b&gt;Tom &amp; Jerry&lt;/b&gt;</td>" in text
+    assert "<b>Tom" not in text
+    assert "Zoë &quot;Z&quot; O&#x27;Neil" in text
+    assert text.count("<tr>") == 5                     # header + 4 students
+    assert "Students: 4" in text
+    assert text.rstrip().endswith("</html>")
+
+
+@pytest.mark.parametrize("ext", [".csv", ".jsonl", ".html"])
+def test_split_by_grade(tmp_path, ext):
+    out = tmp_path / f"report{ext}"
+    counts = export_report(str(out), split_by_grade=True, source=roster(tmp_path))
+
+    expected = {str(tmp_path / f"report_{band}{ext}"): n for band, n in (("A", 2), ("C", 1), ("F", 1))}
+    assert counts == expected
+    assert not out.exists()
+    assert sorted(p.name for p in tmp_path.glob(f"report*{ext}")) == sorted(
+        f"report_{band}{ext}" for band in ("A", "C", "F"))
+    if ext == ".csv":
+        with open(tmp_path / "report_A.csv", newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        assert [r[0] for r in rows[1:]] == ["1001", "1003"]
+
+
+def test_empty_roster_writes_a_header_only_file(tmp_path):
+    source = roster(tmp_path, [])
+    out = tmp_path / "report.csv"
+    assert export_report(str(out), source=source) == {str(out): 0}
+    assert out.read_text(encoding="utf-8").splitlines() == [",".join(REPORT_COLUMNS)]
+
+    html_out = tmp_path / "report.html"
+    export_report(str(html_out), source=source)
+    assert "Students: 0" in html_out.read_text(encoding="utf-8")
+
+    # Split by grade: no band has anyone, so there is nothing to write
+    assert export_report(str(tmp_path / "split.csv"), split_by_grade=True, source=source) == {}
+
+
+def test_missing_roster_is_empty(tmp_path):
+    out = tmp_path / "report.jsonl"
+    assert export_report(str(out), source=str(tmp_path / "missing.txt")) == {str(out): 0}
+    assert out.read_text() == ""
+
+
+def test_unsupported_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_report(str(tmp_path / "report.pdf"), source=roster(tmp_path))
+    assert not (tmp_path / "report.pdf").exists()
+
+
+def test_grade_bands():
+    def student(total):
+        return {"course1": 0, "course2": 0, "course3": 0, "exam": total}
+    # 70% of 160 = 112, 60% = 96, 50% = 80, 40% = 64
+    assert [grade(student(t)) for t in (112, 111, 96, 95, 80, 79, 64, 63, 0)] == \
+        ["A", "B", "B", "C", "C", "D", "D", "F", "F"]
+
+
+# ----------------------- RANKS -----------------------
+
+def oracle_rank(scores, score):
+    """1 + how many scores in the list beat `score` (whole marks, as stored)."""
+    return 1 + sum(1 for s in scores if int(s) > int(score))
+
+
+def oracle_describe(scores, score):
+    rank = oracle_rank(scores, score)
+    return f"Rank {rank} of {len(scores):,} (top {rank / len(scores) * 100:.1f}%)"
+
+
+def test_ranks_match_a_sorted_list():
+    rng = random.Random(8)
+    ranks, scores = ScoreRanks(160), []
+    for _ in range(300):
+        score = rng.randint(0, 160)
+        ranks.add(score)
+        scores.append(score)
+    for score in range(161):
+        assert ranks.rank(score) == oracle_rank(scores, score)
+        assert ranks.count_at_most(score) == sum(1 for s in scores if s <= score)
+    for score in rng.sample(scores, 20):
+        assert ranks.describe(score) == oracle_describe(sorted(scores, reverse=True), score)
+
+
+def test_ties_share_a_rank():
+    ranks = ScoreRanks(160)
+    for score in (90, 120, 120, 120, 60):
+        ranks.add(score)
+    assert [ranks.rank(s) for s in (120, 90, 60)] == [1, 4, 5]
+    assert ranks.describe(120) == "Rank 1 of 5 (top 20.0%)"
+    assert ranks.describe(60) == "Rank 5 of 5 (top 100.0%)"
+
+
+def test_bucket_limits():
+    ranks = ScoreRanks(160)
+    for score in (0, 0, 160, 80):
+        ranks.add(score)
+    assert ranks.rank(160) == 1
+    assert ranks.rank(0) == 3
+    assert ranks.count_at_most(0) == 2
+    assert ranks.count_at_most(160) == 4
+    # Out-of-range scores are clamped into the end buckets
+    ranks.add(-5)
+    ranks.add(999)
+    assert ranks.count_at_most(0) == 3
+    assert ranks.rank(160) == 1 and ranks.count == 6
+    assert ranks.count_at_most(999) == 6
+
+
+def test_add_then_remove_restores_the_tree():
+    rng = random.Random(3)
+    ranks = ScoreRanks(160)
+    base = [rng.randint(0, 160) for _ in range(50)]
+    for score in base:
+        ranks.add(score)
+    before = (list(ranks.tree), ranks.count)
+
+    extra = [rng.randint(0, 160) for _ in range(40)] + [0, 160, 160]
+    for score in extra:
+        ranks.add(score)
+    for score in reversed(extra):
+        ranks.remove(score)
+    assert (ranks.tree, ranks.count) == before
+    assert [ranks.rank(s) for s in range(161)] == [oracle_rank(base, s) for s in range(161)]
+
+
+def test_empty_ranks():
+    ranks = ScoreRanks(100)
+    assert ranks.rank(50) == 1
+    assert ranks.describe(50) == "Rank 1 of 0 (top 0.0%)"
@@ -0,0 +1,74 @@
+"""Tests for the inverted-index joke search, against a brute-force oracle."""
+
+import math
+import random
+from array import array
+
+import pytest
+
+from joke_search import FIELD_WEIGHTS, JokeSearchIndex
+from jokes import tokenize
+
+
+def synthetic_jokes(n, seed=3):
+    rng = random.Random(seed)
+    words = [f"{stem}{end}" for stem in ("chick", "bear", "road", "cat", "sea", "pun")
+             for end in ("", "s", "en", "y", "ing")] + [f"w{i}" for i in range(40)]
+    return [tuple(" ".join(rng.choice(words) for _ in range(rng.randint(1, 6))) for _ in range(3))
+            for _ in range(n)]
+
+
+def oracle(index, jokes, query, limit):
+    """Score every joke the slow way; return the top (score, id) pairs."""
+    results = []
+    terms = list(dict.fromkeys(tokenize(query)))
+    for joke_id, joke in enumerate(jokes):
+        weights = {}
+        for field, weight in zip(joke, FIELD_WEIGHTS):
+            for word in tokenize(field):
+                weights[word] = weights.get(word, 0.0) + weight
+        total = 0.0
+        for term in terms:
+            scores = []
+            for word in index.expand(term):
+                if word in weights:
+                    idf = math.log(1 + index.count / len(index.postings[word][0]))
+                    weight = array("f", [weights[word]])[0]     # as stored in the index
+                    scores.append(weight * (idf if word == term else idf * 0.5))
+            if not scores:
+                break
+            total += max(scores)
+        else:
+            if terms:
+                results.append((total, joke_id))
+    results.sort(key=lambda r: (-r[0], r[1]))
+    return results[:limit]
+
+
+JOKES = synthetic_jokes(400)
+INDEX = JokeSearchIndex.build(JOKES)
+
+
+@pytest.mark.parametrize("query", ["chick", "chicken", "c", "bear road", "s", "w1 ch",
+                                   "CAT, sea!", "pun pun", "zzz", "", "bears w3 road"])
+@pytest.mark.parametrize("limit", [1, 5, 20])
+def test_search_matches_the_oracle(query, limit):
+    expected = oracle(INDEX, JOKES, query, limit)
+    got = INDEX.search(query, limit)
+    scores = dict((joke_id, score) for score, joke_id in oracle(INDEX, JOKES, query, len(JOKES)))
+    # Same scores in the same order; jokes tied with the last one may differ.
+    assert [scores[j] for j in got] == [score for score, _ in expected]
+    if len(tokenize(query)) == 1:
+        assert got == [joke_id for _, joke_id in expected]
+
+
+def test_exact_word_ranks_above_prefix_match():
+    index = JokeSearchIndex.build([("the chicken crossed", "", ""), ("a chick crossed", "", "")])
+    assert index.search("chick") == [1, 0]
+
+
+def test_added_jokes_are_found_and_reordered():
+    index = JokeSearchIndex.build([("bear", "", "")])
+    assert index.search("bear") == [0]
+    index.add(1, ("bear bear", "bear", ""))
+    assert index.search("bear") == [1, 0]
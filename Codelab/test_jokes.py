@@ -0,0 +1,173 @@
+"""Tests for the joke app's logic (jokes.py)."""
+
+import random
+from collections import Counter
+
+import pytest
+
+from jokes import (RATING_RECORD_V1, RATINGS_HEADER, RATINGS_MAGIC, ShuffleBag,
+                   WeightedJokeSampler, build_alias_table, chunk_boundaries, load_jokes_from_data,
+                   load_jokes_parallel, load_ratings, load_sessions, rating_weight, ratings_key,
+                   resume_joke_bag, save_ratings, save_sessions)
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 5, 64, 100, 1000])
+def test_shuffle_bag_is_a_permutation(n):
+    bag = ShuffleBag(n, seed=42)
+    assert sorted(bag.next() for _ in range(n)) == list(range(n))
+    # ...and the next round is another full permutation
+    assert sorted(bag.next() for _ in range(n)) == list(range(n))
+
+
+def test_shuffle_bag_depends_on_the_seed():
+    orders = {tuple(ShuffleBag(50, seed=s).next() for _ in range(50)) for s in range(5)}
+    assert len(orders) == 5
+
+
+def test_resumed_bag_continues_where_it_stopped(tmp_path):
+    path = str(tmp_path / "session.json")
+    bag = ShuffleBag(20, seed=7)
+    told = [bag.next() for _ in range(8)]
+    save_sessions({"built-in:x": bag.state()}, path)
+
+    resumed = resume_joke_bag(20, load_sessions(path)["built-in:x"])
+    rest = [resumed.next() for _ in range(12)]
+    assert sorted(told + rest) == list(range(20))
+    assert rest == [bag.next() for _ in range(12)]
+
+
+@pytest.mark.parametrize("saved", [
+    None, {}, "junk", {"n": 10, "seed": 1},
+    {"n": 11, "seed": 1, "position": 3},        # saved for a different number of jokes
+])
+def test_unusable_saved_state_starts_a_fresh_bag(saved):
+    bag = resume_joke_bag(10, saved)
+    assert bag.n == 10 and bag.position == 0
+
+
+def test_load_sessions_ignores_bad_files(tmp_path):
+    path = tmp_path / "session.json"
+    assert load_sessions(str(path)) == {}
+    path.write_text("[1, 2]")
+    assert load_sessions(str(path)) == {}
+    path.write_text("{not json")
+    assert load_sessions(str(path)) == {}
+
+
+# ----------------------- PARALLEL INGEST -----------------------
+
+INGEST_LINES = [
+    "Why did the chicken cross the road?To get to the other side.|Classic.",
+    "",
+    "no question mark here",                     # malformed
+    "What is this?|only an explanation",         # malformed: empty punchline
+    "   ",
+    "Ünïcode jökes spread over a chunk edge?Sürely.|Multi-byte characters.",
+    "No explanation?Still a joke.",
+    "Windows line ending?Is stripped.|Yes.\r",
+    "?Empty setup.|Still counts as a joke.",
+]
+
+
+def write_joke_file(tmp_path, lines, trailing_newline=True):
+    text = "\n".join(lines) + ("\n" if trailing_newline else "")
+    path = tmp_path / "jokes.txt"
+    path.write_bytes(text.encode("utf-8"))
+    return str(path), text
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3])
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_parallel_ingest_matches_serial_parse(tmp_path, workers, trailing_newline):
+    # Many short chunks, so chunk edges land in the middle of lines
+    lines = [line.replace("chicken", f"chicken {i}") for i in range(40) for line in INGEST_LINES]
+    path, text = write_joke_file(tmp_path, lines, trailing_newline)
+
+    jokes, report = load_jokes_parallel(path, workers)
+
+    assert list(jokes) == load_jokes_from_data(text)
+    assert [jokes[i] for i in range(len(jokes))] == list(jokes)
+    assert sum(chunk["malformed"] for chunk in report) == 2 * 40
+    assert sum(chunk["jokes"] for chunk in report) == len(jokes)
+    assert len(report) > 1
+
+
+def test_chunk_boundaries_cover_the_file_on_line_starts(tmp_path):
+    path, text = write_joke_file(tmp_path, INGEST_LINES * 10)
+    data = text.encode("utf-8")
+    bounds = chunk_boundaries(path, 7)
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(data)
+    for (_, end), (start, _) in zip(bounds, bounds[1:]):
+        assert end == start and data[start - 1:start] == b"\n"
+
+
+def test_parallel_ingest_of_an_empty_file(tmp_path):
+    path, _ = write_joke_file(tmp_path, [], trailing_newline=False)
+    jokes, report = load_jokes_parallel(path, 2)
+    assert len(jokes) == 0 and report == []
+
+
+# ----------------------- RATINGS & WEIGHTED DRAWS -----------------------
+
+def numbered_jokes(ids):
+    return [(f"Setup {i}?", f"Punchline {i}", "") for i in ids]
+
+
+def test_ratings_round_trip(tmp_path):
+    path = str(tmp_path / "ratings.bin")
+    jokes = numbered_jokes(range(10))
+    save_ratings({2: [3, 1], 7: [0, 4]}, jokes, "src", path)
+    assert load_ratings(jokes, "src", path) == {2: [3, 1], 7: [0, 4]}
+    assert load_ratings(jokes, "other source", path) == {}
+
+
+def test_ratings_follow_jokes_that_moved_and_drop_removed_ones(tmp_path):
+    path = str(tmp_path / "ratings.bin")
+    save_ratings({2: [3, 1], 5: [1, 0], 7: [0, 4]}, numbered_jokes(range(10)), "src", path)
+
+    # Two new jokes in front, joke 5 removed: ids shift by two
+    edited = numbered_jokes(["new a", "new b"] + [i for i in range(10) if i != 5])
+    assert load_ratings(edited, "src", path) == {4: [3, 1], 8: [0, 4]}
+    # Fewer jokes than the saved ids
+    assert load_ratings(numbered_jokes([7]), "src", path) == {0: [0, 4]}
+
+
+def test_version_1_ratings_load_while_the_count_matches(tmp_path):
+    path = tmp_path / "ratings.bin"
+    path.write_bytes(RATINGS_HEADER.pack(RATINGS_MAGIC, 1, 5, ratings_key("src"))
+                     + RATING_RECORD_V1.pack(1, 2, 0) + RATING_RECORD_V1.pack(9, 1, 1))
+    assert load_ratings(numbered_jokes(range(5)), "src", str(path)) == {1: [2, 0]}
+    assert load_ratings(numbered_jokes(range(6)), "src", str(path)) == {}
+
+
+def test_alias_table_gives_each_weight_its_share():
+    weights = [1.0, 2.0, 0.5, 4.0, 0.25, 1.0]
+    prob, alias = build_alias_table(weights)
+    n = len(weights)
+    shares = [p / n for p in prob]
+    for i, p in enumerate(prob):
+        shares[alias[i]] += (1 - p) / n
+    total = sum(weights)
+    assert shares == pytest.approx([w / total for w in weights])
+
+
+def test_weighted_sampler_distribution():
+    # Jokes 0-2 rated, 3-7 unrated (weight 1), 8 excluded as a duplicate
+    ratings = {0: [3, 0], 1: [0, 3], 2: [1, 1]}
+    sampler = WeightedJokeSampler(9, ratings, excluded=frozenset({8}), rng=random.Random(5))
+    draws = 60_000
+    counts = Counter(sampler.draw() for _ in range(draws))
+
+    weights = {j: 1.0 for j in range(8)}
+    weights.update({j: rating_weight(*r) for j, r in ratings.items()})
+    total = sum(weights.values())
+    assert 8 not in counts
+    for joke_id, weight in weights.items():
+        assert counts[joke_id] / draws == pytest.approx(weight / total, abs=0.01)
+
+
+def test_weighted_sampler_follows_new_ratings():
+    sampler = WeightedJokeSampler(3, {}, rng=random.Random(2))
+    sampler.set_rating(1, 40, 0)            # weight 41 against 1 and 1
+    counts = Counter(sampler.draw() for _ in range(4_000))
+    assert counts[1] / 4_000 == pytest.approx(41 / 43, abs=0.02)
@@ -0,0 +1,104 @@
+"""Round-trip and corruption tests for the binary leaderboard format."""
+
+import json
+import struct
+
+import pytest
+
+from leaderboard_format import (HEADER, RECORD, InvalidEntryError, LeaderboardFile,
+                                LeaderboardFormatError, append_entries, check_entry,
+                                migrate_json, write_leaderboard)
+
+
+def entry(name, score, grade="B", date="2025-01-02T03:04:05"):
+    return {"name": name, "score": score, "grade": grade, "date": date}
+
+
+def read_all(path):
+    with LeaderboardFile(path) as lbf:
+        return lbf[:]
+
+
+def test_write_round_trip_sorted_best_first(tmp_path):
+    path = str(tmp_path / "lb.bin")
+    entries = [entry("ann", 50), entry("bob", 90, "A+"), entry("cy", 70), entry("ann", 80, "A")]
+    write_leaderboard(path, entries)
+
+    assert read_all(path) == sorted(entries, key=lambda e: e["score"], reverse=True)
+    with LeaderboardFile(path) as lbf:
+        assert len(lbf) == 4
+        assert lbf.names == ["bob", "ann", "cy"]       # each name stored once
+        assert lbf.top(2) == read_all(path)[:2]
+        assert lbf[-1]["score"] == 50
+
+
+def test_append_merges_in_order_and_keeps_ties_stable(tmp_path):
+    path = str(tmp_path / "lb.bin")
+    write_leaderboard(path, [entry("old", 90), entry("old", 60), entry("mid", 60)])
+    append_entries(path, [entry("new", 60), entry("top", 100), entry("low", 10), entry("ünï", 75)])
+
+    names_scores = [(e["name"], e["score"]) for e in read_all(path)]
+    assert names_scores == [("top", 100), ("old", 90), ("ünï", 75),
+                            ("old", 60), ("mid", 60), ("new", 60), ("low", 10)]
+
+
+def test_append_creates_missing_file(tmp_path):
+    path = str(tmp_path / "lb.bin")
+    append_entries(path, [entry("a", 30), entry("b", 40)])
+    assert [e["name"] for e in read_all(path)] == ["b", "a"]
+
+
+def test_migrate_json_fills_missing_grades(tmp_path):
+    json_path = tmp_path / "leaderboard.json"
+    bin_path = str(tmp_path / "leaderboard.bin")
+    json_path.write_text(json.dumps([
+        {"name": "a", "score": 95, "date": "2025-01-01T00:00:00"},
+        {"name": "b", "score": 40, "grade": "D", "date": "2025-01-01T00:00:00"},
+    ]), encoding="utf-8")
+
+    assert migrate_json(str(json_path), bin_path, lambda score: "A+" if score >= 90 else "D") == 2
+    assert [(e["name"], e["grade"]) for e in read_all(bin_path)] == [("a", "A+"), ("b", "D")]
+
+
+def test_missing_grade_and_date_read_back_as_unknown(tmp_path):
+    path = str(tmp_path / "lb.bin")
+    write_leaderboard(path, [{"name": "a", "score": 10}])
+    (e,) = read_all(path)
+    assert e["grade"] == ""
+    assert e["score"] == 10
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda data: data[:HEADER.size - 1],                               # too short
+    lambda data: b"XXXX" + data[4:],                                   # bad magic
+    lambda data: data[:8] + struct.pack("<Q", 10**6) + data[16:],      # bad count
+    lambda data: data[:HEADER.size + RECORD.size],                     # truncated records
+    lambda data: data[:-2],                                            # truncated names
+    lambda data: data[:-3] + b"\xff\xfe\xfd",                          # names not UTF-8
+])
+def test_corrupt_files_raise_format_error(tmp_path, corrupt):
+    path = tmp_path / "lb.bin"
+    write_leaderboard(str(path), [entry("alice", 90), entry("bob", 80)])
+    path.write_bytes(corrupt(path.read_bytes()))
+
+    with pytest.raises(LeaderboardFormatError):
+        read_all(str(path))
+
+
+@pytest.mark.parametrize("bad", [
+    {"name": "x" * 70_000, "score": 10},
+    {"name": "a", "score": -1},
+    {"name": "a", "score": 70_000},
+    {"name": "\ud800", "score": 10},
+    {"name": None, "score": 10},
+    {"score": 10},
+    {"name": "a", "score": 10, "date": "not a date"},
+])
+def test_check_entry_rejects_what_cannot_be_stored(bad):
+    with pytest.raises(InvalidEntryError):
+        check_entry(bad)
+
+
+def test_check_entry_accepts_normal_entries():
+    check_entry(entry("ann", 100))
+    check_entry({"name": "b", "score": 0})
@@ -0,0 +1,44 @@
+"""Memory regression tests, using the helpers in mem_profile."""
+
+import random
+
+import pytest
+
+import jokes
+from mem_profile import assert_peak_below, deep_sizeof, measure_peak
+
+
+def synthetic_jokes(n, seed=1):
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(2000)]
+    jokes = [(f"Question {i}?", " ".join(rng.choice(words) for _ in range(8)), "") for i in range(n)]
+    for i in range(0, n - 1, 50):
+        jokes[i + 1] = (jokes[i + 1][0], jokes[i][1] + " again", "")
+    return jokes
+
+
+def test_duplicate_scan_keeps_no_signatures():
+    # About 64 bytes a joke in band keys; keeping the 64-value signatures
+    # (as before) took well over 5 KB a joke.
+    corpus = synthetic_jokes(1500)
+    clusters = assert_peak_below(1_500_000, jokes.find_duplicate_clusters, corpus)
+    assert [0, 1] in clusters
+
+
+def test_assert_peak_below_catches_growth():
+    with pytest.raises(AssertionError):
+        assert_peak_below(1_000_000, lambda: [object() for _ in range(100_000)])
+
+
+def test_measure_peak_returns_result():
+    result, peak = measure_peak(lambda: bytearray(500_000))
+    assert len(result) == 500_000
+    assert peak >= 500_000
+
+
+def test_deep_sizeof_does_not_follow_modules():
+    # The sampler holds the random module; its size must not include the interpreter.
+    sampler = jokes.WeightedJokeSampler(10, {})
+    assert sampler.rng is random
+    assert deep_sizeof(sampler) < 10_000
+    assert deep_sizeof({"f": deep_sizeof, "cls": dict}) < 1_000
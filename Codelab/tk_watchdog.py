@@ -0,0 +1,147 @@
+"""
+Event-loop stall monitor for the Codelab Tkinter apps.
+
+A Tk app freezes whenever a handler (update_table, apply_theme, saving the
+leaderboard, ...) keeps the main thread busy. The monitor notices this:
+
+ - the Tk loop bumps a heartbeat timestamp every few milliseconds via after()
+ - a side thread checks the heartbeat; when it is older than the threshold
+   the main thread is stalled, and its current stack is captured
+ - when the heartbeat comes back the stall's full duration is recorded
+
+Every stall is kept with the app function that was running and its stack, and
+`write_report()` saves them as JSON that can be attached to a bug ticket.
+
+Opt-in: set CODELAB_STALL_MONITOR=1 (optionally CODELAB_STALL_THRESHOLD_MS and
+CODELAB_STALL_REPORT) before starting an app.
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+
+CODELAB_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_THRESHOLD = 0.2     # seconds without a heartbeat that count as a stall
+HEARTBEAT_INTERVAL = 0.02   # seconds between heartbeats
+DEFAULT_REPORT = "stall_report.json"
+
+
+def handler_name(frames):
+    """The innermost app function on the stack (skipping Tk and the stdlib)."""
+    for frame in reversed(frames):
+        if os.path.dirname(os.path.abspath(frame.filename)) == CODELAB_DIR \
+                and os.path.basename(frame.filename) != os.path.basename(__file__):
+            return f"{os.path.basename(frame.filename)}:{frame.name}"
+    return frames[-1].name if frames else "?"
+
+
+class StallMonitor:
+    """Watches a Tk root's event loop and records every stall."""
+
+    def __init__(self, root, threshold=DEFAULT_THRESHOLD, interval=HEARTBEAT_INTERVAL,
+                 report_path=DEFAULT_REPORT):
+        self.root = root
+        self.threshold = threshold
+        self.interval = interval
+        self.report_path = report_path
+        self.stalls = []
+        self._lock = threading.Lock()
+        self._last_beat = time.perf_counter()
+        self._current = None            # stall in progress, if any
+        self._main_ident = threading.main_thread().ident
+        self._stop = threading.Event()
+        self._after_id = None
+        self._thread = None
+
+    def start(self):
+        self._last_beat = time.perf_counter()
+        self._beat()
+        self._thread = threading.Thread(target=self._watch, name="tk-stall-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join()
+        self._finish_stall(time.perf_counter())
+
+    # --- Tk thread ---
+    def _beat(self):
+        now = time.perf_counter()
+        with self._lock:
+            self._last_beat = now
+        self._finish_stall(now)
+        self._after_id = self.root.after(int(self.interval * 1000), self._beat)
+
+    def _finish_stall(self, now):
+        with self._lock:
+            stall, self._current = self._current, None
+        if stall is not None:
+            stall["duration_ms"] = round((now - stall.pop("_start")) * 1000, 1)
+            self.stalls.append(stall)
+
+    # --- side thread ---
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            with self._lock:
+                behind = now - self._last_beat
+                if behind < self.threshold or self._current is not None:
+                    continue
+                frame = sys._current_frames().get(self._main_ident)
+                frames = traceback.extract_stack(frame) if frame is not None else []
+                self._current = {
+                    "_start": self._last_beat,
+                    "started": datetime.now().isoformat(timespec="milliseconds"),
+                    "handler": handler_name(frames),
+                    "stack": traceback.format_list(frames),
+                }
+
+    # --- report ---
+    def report(self):
+        return {
+            "app": os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "?",
+            "threshold_ms": self.threshold * 1000,
+            "stall_count": len(self.stalls),
+            "worst_ms": max((s["duration_ms"] for s in self.stalls), default=0),
+            "stalls": self.stalls,
+        }
+
+    def write_report(self, path=None):
+        path = path or self.report_path
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+
+def install_from_env(root):
+    """Start a monitor on `root` if CODELAB_STALL_MONITOR is set.
+
+    The report is written when the app exits. Returns the monitor (or None
+    when monitoring is off).
+    """
+    if os.environ.get("CODELAB_STALL_MONITOR", "") in ("", "0"):
+        return None
+    threshold = float(os.environ.get("CODELAB_STALL_THRESHOLD_MS", DEFAULT_THRESHOLD * 1000)) / 1000
+    monitor = StallMonitor(root, threshold=threshold,
+                           report_path=os.environ.get("CODELAB_STALL_REPORT", DEFAULT_REPORT)).start()
+
+    def write_on_exit():
+        monitor.stop()
+        path = monitor.write_report()
+        print(f"Stall report: {len(monitor.stalls)} stall(s) written to {path}")
+
+    atexit.register(write_on_exit)
+    return monitor